@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The site modules live flat in src/ (see main.sh), so make them importable
+# when benchmarks are run with `python3 -m benchmarks.<name>` from the repo root.
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
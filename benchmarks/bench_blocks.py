@@ -0,0 +1,62 @@
+import argparse
+import timeit
+
+import benchmarks  # noqa: F401
+from benchmarks.corpus import CorpusGenerator
+from misc import block_to_block_type, markdown_to_html_node
+
+SAMPLE_BLOCKS = {
+    "heading": "### A heading with **bold** text",
+    "paragraph": "A paragraph with *italic*, `code` and a [link](https://example.com).\nIt wraps onto a second line.",
+    "code": "```\ndef add(x, y):\n    return x + y\n```",
+    "quote": "> All that is gold does not glitter,\n> Not all those who wander are lost",
+    "unordered_list": "\n".join(f"* item {i} with **bold**" for i in range(10)),
+    "ordered_list": "\n".join(f"{i}. step {i}" for i in range(1, 11)),
+    "table": "| Name | Qty | Price |\n|:--|--:|:-:|\n" + "\n".join(f"| item {i} | {i} | **{i}.99** |" for i in range(10)),
+}
+
+# Our slowest docs: reference tables and deeply nested outlines.
+HEAVY_PAGES = {
+    "table-heavy": {"table": 4, "paragraph": 1},
+    "list-heavy": {"nested_list": 4, "paragraph": 1},
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time block classification and markdown_to_html_node per block type.")
+    parser.add_argument("--blocks", type=int, default=500, help="blocks of each type in the mixed document")
+    parser.add_argument("--pages", type=int, default=50, help="pages in each of the table- and list-heavy sets")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'block type':>16} {'classify us':>12} {'to_html_node us':>16}")
+    for block_type, block in SAMPLE_BLOCKS.items():
+        assert block_to_block_type(block) == block_type, block_type
+        number = 2000
+        classify = min(timeit.repeat(lambda: block_to_block_type(block), number=number, repeat=args.repeat))
+        convert = min(timeit.repeat(lambda: markdown_to_html_node(block), number=number, repeat=args.repeat))
+        print(f"{block_type:>16} {classify / number * 1e6:>12.2f} {convert / number * 1e6:>16.2f}")
+
+    document = "\n\n".join(list(SAMPLE_BLOCKS.values()) * args.blocks)
+    full = min(timeit.repeat(lambda: markdown_to_html_node(document), number=1, repeat=args.repeat))
+    blocks = len(SAMPLE_BLOCKS) * args.blocks
+    print(f"mixed document: {blocks} blocks, {len(document) / 1024:.0f} KiB in {full * 1000:.1f} ms")
+
+    for name, block_mix in HEAVY_PAGES.items():
+        generator = CorpusGenerator(block_mix=block_mix, words_per_block=80)
+        pages = [generator.page(f"Page {i}") for i in range(args.pages)]
+        elapsed = min(timeit.repeat(lambda: [markdown_to_html_node(page) for page in pages], number=1, repeat=args.repeat))
+        size = sum(len(page) for page in pages)
+        print(f"{name} pages: {args.pages} pages, {size / 1024:.0f} KiB in {elapsed * 1000:.1f} ms")
+
+    # Deeper nesting only adds indentation to read, so time per line should stay roughly flat.
+    print(f"{'list depth':>16} {'us per line':>12}")
+    for depth in (1, 10, 50, 100):
+        lines = 2000
+        document = "\n".join("  " * (i % depth) + f"- item {i}" for i in range(lines))
+        elapsed = min(timeit.repeat(lambda: markdown_to_html_node(document).to_html(), number=1, repeat=args.repeat))
+        print(f"{depth:>16} {elapsed / lines * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
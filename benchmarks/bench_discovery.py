@@ -0,0 +1,76 @@
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+import benchmarks  # noqa: F401
+from discovery import scan_tree
+
+EXCLUDE = ["*.tmp", "drafts/", "/private", "**/node_modules", "!keep.tmp"]
+
+
+def listdir_pages(dir_path):
+    # Mirrors discover_pages before the shared scan: listdir, then isdir/isfile per entry.
+    pages = []
+    for entry in sorted(os.listdir(dir_path)):
+        path = os.path.join(dir_path, entry)
+        if os.path.isdir(path):
+            pages.extend(listdir_pages(path))
+        elif os.path.isfile(path) and entry.endswith(".md"):
+            pages.append(path)
+    return pages
+
+
+def walk_files(root):
+    # Mirrors the static stages, which each ran their own sorted os.walk.
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        files.extend(os.path.join(dir_path, name) for name in sorted(file_names))
+    return files
+
+
+def make_tree(root, files, fanout):
+    dirs = [root]
+    while len(dirs) * fanout < files // fanout:
+        dirs = [os.path.join(d, f"dir{i}") for d in dirs for i in range(fanout)]
+    for index in range(files):
+        dir_path = dirs[index % len(dirs)]
+        os.makedirs(dir_path, exist_ok=True)
+        ext = ".md" if index % 2 else ".png"
+        open(os.path.join(dir_path, f"file{index}{ext}"), "wb").close()
+    return len(dirs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time file discovery on a large synthetic tree.")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--fanout", type=int, default=10, help="subdirectories per directory")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="bench-discovery-")
+    try:
+        dirs = make_tree(root, args.files, args.fanout)
+        print(f"{args.files} files in {dirs} leaf directories")
+
+        # The old build walked the static tree once per stage (copy, fingerprint, images).
+        cases = [
+            ("listdir + isdir/isfile", lambda: listdir_pages(root)),
+            ("os.walk", lambda: walk_files(root)),
+            ("os.walk x3 (old static)", lambda: [walk_files(root) for _ in range(3)]),
+            ("scan_tree", lambda: scan_tree(root)),
+            (f"scan_tree, {len(EXCLUDE)} rules", lambda: scan_tree(root, exclude=EXCLUDE)),
+        ]
+        assert len(scan_tree(root)) == len(walk_files(root)) == args.files
+        print(f"{'':>26} {'ms':>9}")
+        for name, func in cases:
+            elapsed = min(timeit.repeat(func, number=1, repeat=args.repeat))
+            print(f"{name:>26} {elapsed * 1000:>9.1f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import gc
+import timeit
+
+import benchmarks  # noqa: F401
+from benchmarks.corpus import CorpusGenerator
+from htmlnode import EMPTY_CHILDREN, EMPTY_PROPS
+from leafnode import LeafNode
+from misc import markdown_to_html_node
+from parentnode import ParentNode
+
+
+class BaselineHTMLNode:
+    # The node classes as they were before escaping, validation checks included:
+    # raw values, and a generator and join for the props of every node.
+    __slots__ = ("tag", "value", "children", "props")
+
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children if children is not None else EMPTY_CHILDREN
+        self.props = props if props is not None else EMPTY_PROPS
+
+    def props_to_html(self):
+        if not self.props:
+            return ""
+        return " " + " ".join(f'{key}="{value}"' for key, value in self.props.items() if value is not None)
+
+
+class BaselineLeafNode(BaselineHTMLNode):
+    __slots__ = ()
+
+    def __init__(self, tag, value, props=None):
+        if value is None:
+            raise ValueError("LeafNode must have a value.")
+        super().__init__(tag=tag, value=value, children=None, props=props)
+
+    def to_html(self):
+        if self.value is None:
+            raise ValueError("LeafNode must have a value.")
+        if self.tag is None:
+            return self.value
+        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+
+class BaselineParentNode(BaselineHTMLNode):
+    __slots__ = ()
+
+    def __init__(self, tag, children, props=None):
+        if tag is None or children is None:
+            raise ValueError("ParentNode must have a tag.")
+        if not children or len(children) == 0:
+            raise ValueError("ParentNode must have at least one child.")
+        super().__init__(tag=tag, value=None, children=children, props=props)
+
+    def to_html(self):
+        if self.tag is None:
+            raise ValueError("ParentNode must have a tag.")
+        if self.children is None:
+            raise ValueError("ParentNode must have a children.")
+        children_html = "".join(child.to_html() for child in self.children)
+        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+
+
+def copy_tree(node, leaf_class, parent_class):
+    props = dict(node.props) if node.props else None
+    if node.children:
+        return parent_class(node.tag, [copy_tree(child, leaf_class, parent_class) for child in node.children], props)
+    return leaf_class(node.tag, node.value, props)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure what HTML escaping costs when building and rendering nodes.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--special", type=float, default=0.0, help="share of pages with &, < and \" in text and URLs")
+    args = parser.parse_args(argv)
+
+    generator = CorpusGenerator()
+    trees = []
+    for i in range(args.pages):
+        page = generator.page(f"Page {i}")
+        if i < args.pages * args.special:
+            page += '\n\nFish & chips <for> "two" and [a & b](/search?q=a&b&c="d")'
+        trees.append(markdown_to_html_node(page))
+
+    print(f"{'':>10} {'build ms':>10} {'to_html ms':>11}")
+    results = {}
+    for name, leaf_class, parent_class in (("baseline", BaselineLeafNode, BaselineParentNode), ("escaped", LeafNode, ParentNode)):
+        builds = []
+        renders = []
+        for _ in range(args.repeat):
+            gc.collect()
+            # Escaping happens while building; rendering a fresh copy each run keeps the runs alike.
+            builds.append(timeit.timeit(lambda: [copy_tree(t, leaf_class, parent_class) for t in trees], number=1))
+            copies = [copy_tree(tree, leaf_class, parent_class) for tree in trees]
+            renders.append(timeit.timeit(lambda: [copy.to_html() for copy in copies], number=1))
+        results[name] = (min(builds), min(renders))
+        print(f"{name:>10} {results[name][0] * 1000:>10.2f} {results[name][1] * 1000:>11.2f}")
+    build_change = results["escaped"][0] / results["baseline"][0] - 1
+    render_change = results["escaped"][1] / results["baseline"][1] - 1
+    print(f"{'change':>10} {build_change:>+10.1%} {render_change:>+11.1%}")
+
+
+if __name__ == "__main__":
+    main()
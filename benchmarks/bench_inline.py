@@ -0,0 +1,50 @@
+import argparse
+import random
+import timeit
+
+import benchmarks  # noqa: F401
+from misc import text_to_textnodes, text_to_textnodes_multipass
+
+FRAGMENTS = [
+    "plain words that carry no markup at all",
+    "some **bold text**",
+    "an *italic* word",
+    "an _underscored_ word",
+    "a `code span`",
+    "a [link](https://example.com/page)",
+    "an ![image](/images/rivendell.png)",
+]
+
+
+def make_paragraph(words, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < words:
+        fragment = rng.choice(FRAGMENTS)
+        parts.append(fragment)
+        length += len(fragment.split())
+    return " ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the single-pass inline scanner to the multi-pass pipeline.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args(argv)
+
+    print(f"{'words':>8} {'multipass ms':>14} {'single-pass ms':>16} {'speedup':>8}")
+    for words in args.sizes:
+        text = make_paragraph(words)
+        assert text_to_textnodes(text) == text_to_textnodes_multipass(text)
+        number = max(1, 20000 // words)
+        multipass = min(timeit.repeat(lambda: text_to_textnodes_multipass(text), number=number, repeat=args.repeat))
+        single = min(timeit.repeat(lambda: text_to_textnodes(text), number=number, repeat=args.repeat))
+        print(
+            f"{words:>8} {multipass / number * 1000:>14.3f} {single / number * 1000:>16.3f} "
+            f"{multipass / single:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
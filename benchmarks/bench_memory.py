@@ -0,0 +1,79 @@
+import argparse
+import tracemalloc
+
+import benchmarks  # noqa: F401
+from benchmarks.corpus import CorpusGenerator
+from htmlnode import HTMLNode
+from misc import markdown_to_html_node, text_to_textnodes
+from textnode import TextNode
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictHTMLNode:
+    # Mirrors the pre-__slots__ layout: a per-instance __dict__ plus a fresh
+    # list and dict for every node.
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children if children is not None else []
+        self.props = props if props is not None else {}
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.children)
+
+
+def copy_tree(node, node_class):
+    children = [copy_tree(child, node_class) for child in node.children] or None
+    props = dict(node.props) if node.props else None
+    return node_class(node.tag, node.value, children, props)
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure bytes per node for the text and HTML node trees.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=20000, help="repetitions of the inline paragraph")
+    args = parser.parse_args(argv)
+
+    generator = CorpusGenerator()
+    markdown = "\n\n".join(generator.page(f"Page {i}") for i in range(args.pages))
+    print(f"corpus: {len(markdown) / 1e6:.1f} MB of markdown, {args.pages} pages")
+
+    tree = markdown_to_html_node(markdown)
+    html_nodes = count_nodes(tree)
+    # Copies share every string with `tree`, so only node overhead is measured.
+    _, slotted = measure(lambda: copy_tree(tree, HTMLNode))
+    _, legacy = measure(lambda: copy_tree(tree, DictHTMLNode))
+    report("HTMLNode", html_nodes, legacy, slotted)
+
+    paragraph = "An elf with **bold**, *italic*, `code` and a [link](/page). " * args.paragraphs
+    text_nodes = text_to_textnodes(paragraph)
+    _, slotted = measure(lambda: [TextNode(n.text, n.text_type, n.url) for n in text_nodes])
+    _, legacy = measure(lambda: [DictTextNode(n.text, n.text_type, n.url) for n in text_nodes])
+    report("TextNode", len(text_nodes), legacy, slotted)
+
+
+def report(name, count, legacy, slotted):
+    print(
+        f"{name:>9}: {count} nodes, {legacy / count:.0f} B/node with __dict__, "
+        f"{slotted / count:.0f} B/node slotted ({1 - slotted / legacy:.0%} smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import random
+
+import benchmarks  # noqa: F401
+
+DEFAULT_BLOCK_MIX = {
+    "heading": 2,
+    "paragraph": 5,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 2,
+    "ordered_list": 1,
+}
+
+WORDS = [
+    "elf", "dwarf", "hobbit", "ring", "mountain", "river", "wizard", "tower",
+    "forest", "shadow", "council", "journey", "sword", "king", "road", "song",
+]
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+class CorpusGenerator:
+    def __init__(self, seed=0, block_mix=None, inline_density=0.3, blocks_per_page=20, words_per_block=40):
+        self.rng = random.Random(seed)
+        self.block_mix = block_mix or DEFAULT_BLOCK_MIX
+        self.inline_density = inline_density
+        self.blocks_per_page = blocks_per_page
+        self.words_per_block = words_per_block
+        self.block_types = list(self.block_mix)
+        self.block_weights = [self.block_mix[name] for name in self.block_types]
+
+    def inline_text(self, words):
+        parts = []
+        for i in range(words):
+            word = self.rng.choice(WORDS)
+            if self.rng.random() < self.inline_density:
+                kind = self.rng.randrange(6)
+                if kind == 0:
+                    word = f"**{word}**"
+                elif kind == 1:
+                    word = f"*{word}*"
+                elif kind == 2:
+                    word = f"_{word}_"
+                elif kind == 3:
+                    word = f"`{word}`"
+                elif kind == 4:
+                    word = f"[{word}](/{self.rng.choice(WORDS)}/{i})"
+                else:
+                    word = f"![{word}](/images/{self.rng.choice(WORDS)}.png)"
+            parts.append(word)
+        return " ".join(parts)
+
+    def block(self, block_type):
+        words = self.words_per_block
+        if block_type == "heading":
+            return "#" * self.rng.randint(2, 6) + " " + self.inline_text(max(2, words // 8))
+        if block_type == "paragraph":
+            return self.inline_text(words)
+        if block_type == "code":
+            lines = [f"def {self.rng.choice(WORDS)}_{i}():\n    return {i}" for i in range(max(1, words // 10))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        if block_type == "quote":
+            return "\n".join("> " + self.inline_text(8) for _ in range(max(1, words // 8)))
+        if block_type == "unordered_list":
+            return "\n".join("* " + self.inline_text(6) for _ in range(max(1, words // 6)))
+        if block_type == "ordered_list":
+            return "\n".join(f"{i}. " + self.inline_text(6) for i in range(1, max(1, words // 6) + 1))
+        if block_type == "nested_list":
+            lines = []
+            depth = 0
+            for _ in range(max(1, words // 4)):
+                depth = self.rng.randint(0, depth + 1) if lines else 0
+                lines.append("  " * depth + "- " + self.inline_text(4))
+            return "\n".join(lines)
+        if block_type == "table":
+            columns = self.rng.randint(2, 5)
+            header = "| " + " | ".join(self.rng.choice(WORDS).title() for _ in range(columns)) + " |"
+            delimiter = "|" + "|".join(self.rng.choice(("---", ":--", "--:", ":-:")) for _ in range(columns)) + "|"
+            rows = ["| " + " | ".join(self.inline_text(2) for _ in range(columns)) + " |" for _ in range(max(1, words // 4))]
+            return "\n".join([header, delimiter] + rows)
+        raise ValueError(f"Unknown block type: {block_type}")
+
+    def page(self, title):
+        blocks = [f"# {title}"]
+        for block_type in self.rng.choices(self.block_types, self.block_weights, k=self.blocks_per_page):
+            blocks.append(self.block(block_type))
+        return "\n\n".join(blocks) + "\n"
+
+    def page_path(self, index, nesting_depth):
+        depth = index % (nesting_depth + 1)
+        parts = [f"section{(index >> level) % 4}" for level in range(depth)]
+        return os.path.join(*parts, f"page{index}.md") if parts else f"page{index}.md"
+
+
+def generate_site(root, pages=100, nesting_depth=2, static_files=20, static_size=64 * 1024, **generator_options):
+    generator = CorpusGenerator(**generator_options)
+    content_dir = os.path.join(root, "content")
+    static_dir = os.path.join(root, "static")
+    template_path = os.path.join(root, "template.html")
+
+    for index in range(pages):
+        path = os.path.join(content_dir, generator.page_path(index, nesting_depth))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generator.page(f"Page {index}"))
+
+    os.makedirs(os.path.join(static_dir, "images"), exist_ok=True)
+    with open(os.path.join(static_dir, "index.css"), "w", encoding="utf-8") as f:
+        f.write("body { font-family: serif; }\n")
+    for index in range(static_files):
+        with open(os.path.join(static_dir, "images", f"image{index}.png"), "wb") as f:
+            f.write(generator.rng.randbytes(static_size))
+
+    with open(template_path, "w", encoding="utf-8") as f:
+        f.write(TEMPLATE)
+
+    return content_dir, static_dir, template_path
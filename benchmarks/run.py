@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import benchmarks  # noqa: F401
+from benchmarks.corpus import DEFAULT_BLOCK_MIX, generate_site
+from initilizer import generate_pages_recursive, sync_static
+from misc import markdown_to_blocks, markdown_to_html_node, text_to_textnodes
+
+RESULTS_DIR = ".benchmarks"
+
+
+def time_runs(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"min_s": min(timings), "mean_s": statistics.mean(timings), "runs": repeat}
+
+
+def read_pages(content_dir):
+    pages = []
+    for dir_path, _, file_names in os.walk(content_dir):
+        for name in sorted(file_names):
+            with open(os.path.join(dir_path, name), encoding="utf-8") as f:
+                pages.append(f.read())
+    return pages
+
+
+def run_benchmarks(root, args):
+    content_dir, static_dir, template_path = generate_site(
+        root,
+        pages=args.pages,
+        nesting_depth=args.nesting_depth,
+        static_files=args.static_files,
+        seed=args.seed,
+        block_mix=args.block_mix,
+        inline_density=args.inline_density,
+        blocks_per_page=args.blocks_per_page,
+    )
+    public_dir = os.path.join(root, "public")
+    pages = read_pages(content_dir)
+    blocks = [block for page in pages for block in markdown_to_blocks(page)]
+    paragraphs = [block for block in blocks if block[0] not in "#`>*-0123456789"]
+    trees = [markdown_to_html_node(page) for page in pages]
+
+    def build():
+        shutil.rmtree(public_dir, ignore_errors=True)
+        sync_static(static_dir, public_dir)
+        generate_pages_recursive(content_dir, template_path, public_dir, jobs=args.jobs)
+
+    def build_pipelined():
+        shutil.rmtree(public_dir, ignore_errors=True)
+        sync_static(static_dir, public_dir)
+        generate_pages_recursive(content_dir, template_path, public_dir, jobs=args.jobs, pipelined=True)
+
+    results = {}
+    results["build"] = time_runs(build, args.repeat)
+    results["build_pipelined"] = time_runs(build_pipelined, args.repeat)
+    # The build syncs into an emptied public/; here public/ is already up to date, as on most rebuilds.
+    results["sync_static"] = time_runs(lambda: sync_static(static_dir, public_dir), args.repeat)
+    results["markdown_to_blocks"] = time_runs(lambda: [markdown_to_blocks(page) for page in pages], args.repeat)
+    results["text_to_textnodes"] = time_runs(lambda: [text_to_textnodes(text) for text in paragraphs], args.repeat)
+    results["markdown_to_html_node"] = time_runs(lambda: [markdown_to_html_node(page) for page in pages], args.repeat)
+    results["ParentNode.to_html"] = time_runs(lambda: [tree.to_html() for tree in trees], args.repeat)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'benchmark':<22} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = current["min_s"] / previous["min_s"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  ⚠️ regression"
+            regressions.append(name)
+        print(f"{name:<22} {previous['min_s'] * 1000:>12.2f} {current['min_s'] * 1000:>11.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def parse_block_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_BLOCK_MIX:
+            raise argparse.ArgumentTypeError(f"unknown block type: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the build benchmarks on a synthetic site and store the results.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks-per-page", type=int, default=20)
+    parser.add_argument(
+        "--block-mix",
+        type=parse_block_mix,
+        default=None,
+        help="weights per block type, e.g. paragraph=5,unordered_list=2 (default: a typical page)",
+    )
+    parser.add_argument("--inline-density", type=float, default=0.3, help="share of words with inline markup")
+    parser.add_argument("--nesting-depth", type=int, default=2, help="directory depth of generated pages")
+    parser.add_argument("--static-files", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help=f"results file (default: {RESULTS_DIR}/<git revision>.json)")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="site-bench-")
+    try:
+        results = run_benchmarks(root, args)
+    finally:
+        shutil.rmtree(root)
+
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "python": platform.python_version(),
+        "params": {
+            "pages": args.pages,
+            "blocks_per_page": args.blocks_per_page,
+            "block_mix": args.block_mix or DEFAULT_BLOCK_MIX,
+            "inline_density": args.inline_density,
+            "nesting_depth": args.nesting_depth,
+            "static_files": args.static_files,
+            "seed": args.seed,
+            "jobs": args.jobs,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:<22} {result['min_s'] * 1000:>10.2f} ms (mean {result['mean_s'] * 1000:.2f} ms)")
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print("warning: baseline was recorded with different parameters")
+        if compare(results, baseline, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
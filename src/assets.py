@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import shutil
+from leafnode import LeafNode
+from parentnode import ParentNode
+from manifest import hash_bytes, hash_file
+from discovery import scan_tree
+
+HASH_LENGTH = 10
+MANIFEST_NAME = "assets.json"
+
+ATTR_URL_RE = re.compile(r"""\b(src|href)=(["'])(/[^"']*)\2""")
+
+
+def fingerprinted_name(name, digest):
+    base, ext = os.path.splitext(name)
+    return f"{base}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def split_url(url):
+    for separator in ("?", "#"):
+        index = url.find(separator)
+        if index != -1:
+            return url[:index], url[index:]
+    return url, ""
+
+
+class AssetManifest:
+    def __init__(self, assets=None, images=None):
+        # Maps the public URL of a static file to its fingerprinted URL.
+        self.assets = assets if assets is not None else {}
+        # Maps the public URL of an image to its size and responsive variants.
+        self.images = images if images is not None else {}
+        self._digest = None
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls()
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.assets, f, indent=2, sort_keys=True)
+
+    @property
+    def digest(self):
+        # Computed once: the manifest is complete before pages are rendered.
+        if self._digest is None:
+            inputs = [self.assets, self.images] if self.images else self.assets
+            self._digest = hash_bytes(json.dumps(inputs, sort_keys=True).encode("utf-8"))
+        return self._digest
+
+    def digest_for(self, urls):
+        # Covers only the entries rewrite_node would look up for these URLs, so a
+        # page's cached body survives edits to assets it doesn't reference.
+        paths = sorted({split_url(url)[0] for url in urls})
+        used = [[path, self.assets.get(path), self.images.get(path)] for path in paths]
+        return hash_bytes(json.dumps(used, sort_keys=True).encode("utf-8"))
+
+    def url_for(self, url):
+        path, suffix = split_url(url)
+        fingerprinted = self.assets.get(path)
+        if fingerprinted is None:
+            return url
+        return fingerprinted + suffix
+
+    def rewrite_html(self, html):
+        return ATTR_URL_RE.sub(
+            lambda match: f"{match.group(1)}={match.group(2)}{self.url_for(match.group(3))}{match.group(2)}",
+            html,
+        )
+
+    def image_node(self, node):
+        path = split_url(node.props.get("src", ""))[0]
+        info = self.images.get(path)
+        if info is None:
+            return node
+        props = dict(node.props)
+        props["width"] = str(info["width"])
+        props["height"] = str(info["height"])
+        srcset = info["srcset"]
+        ext = os.path.splitext(path)[1].lower()
+        if len(srcset.get(ext, ())) > 1:
+            props["srcset"] = format_srcset(srcset[ext])
+            props["sizes"] = "100vw"
+        node.props = props
+        if ".webp" not in srcset:
+            return node
+        source = LeafNode("source", "", {"type": "image/webp", "srcset": format_srcset(srcset[".webp"]), "sizes": "100vw"})
+        return ParentNode("picture", [source, node])
+
+    def rewrite_node(self, node):
+        props = node.props
+        if props:
+            changed = None
+            for attr in ("src", "href"):
+                url = props.get(attr)
+                if url is not None and url.startswith("/"):
+                    new_url = self.url_for(url)
+                    if new_url != url:
+                        changed = changed or dict(props)
+                        changed[attr] = new_url
+            if changed is not None:
+                node.props = changed
+        children = node.children
+        for index, child in enumerate(children):
+            # Images are looked up by their source URL, before it is fingerprinted.
+            if child.tag == "img" and self.images:
+                children[index] = self.image_node(child)
+            self.rewrite_node(child)
+        return node
+
+
+def format_srcset(candidates):
+    return ", ".join(f"{url} {width}w" for url, width in candidates)
+
+
+def fingerprint_static(src, dest, previous=None, tree=None):
+    if tree is None:
+        tree = scan_tree(src)
+
+    manifest = AssetManifest()
+    for rel_path, entry in tree.files:
+        rel_dir, name = os.path.split(rel_path)
+        hashed_name = fingerprinted_name(name, hash_file(entry.path))
+        dest_path = os.path.join(dest, rel_dir, hashed_name)
+        # Always a real copy: a hard link would change if the source were edited in place.
+        if not os.path.exists(dest_path):
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            shutil.copy2(entry.path, dest_path)
+
+        url_dir = "/" + rel_dir.replace(os.sep, "/") if rel_dir else ""
+        manifest.assets[f"{url_dir}/{name}"] = f"{url_dir}/{hashed_name}"
+
+    if previous is not None:
+        current = set(manifest.assets.values())
+        for url in previous.assets.values():
+            if url not in current:
+                stale_path = os.path.join(dest, url.lstrip("/"))
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+
+    return manifest
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bump when the layout of an entry changes: the title line, then the body.
+ENTRY_FORMAT = 2
+
+
+class HTMLCache:
+    def __init__(self, cache_dir, version, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, markdown, salt=""):
+        digest = hashlib.sha256()
+        digest.update(str((ENTRY_FORMAT, self.version)).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(salt.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(markdown.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key[2:] + ".html")
+
+    def get(self, key):
+        # Returns (html, title), or None on a miss.
+        path = self.path_for(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                title = json.loads(f.readline())
+                html = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # The mtime doubles as the last-used time for LRU eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return html, title
+
+    def put(self, key, html, title=None):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # The title is stored with the body so a hit titles the page exactly as a parse would.
+            f.write(json.dumps(title) + "\n")
+            f.write(html)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        total = 0
+        for dir_path, _, file_names in os.walk(self.cache_dir):
+            for name in file_names:
+                path = os.path.join(dir_path, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, path, stat.st_size))
+                total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
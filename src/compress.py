@@ -0,0 +1,100 @@
+import gzip
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg", ".xml", ".json")
+MIN_SIZE = 256
+# A sidecar is only kept if it is at most this fraction of the original.
+MAX_RATIO = 0.9
+
+
+def gzip_compress(data):
+    # mtime=0 keeps the output byte-identical across builds.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=11)
+
+
+COMPRESSORS = {"gz": gzip_compress}
+if brotli is not None:
+    COMPRESSORS["br"] = brotli_compress
+
+
+def available_formats():
+    return tuple(COMPRESSORS)
+
+
+def compress_file(path, formats):
+    stats = Counter()
+    source_stat = os.stat(path)
+    data = None
+
+    for fmt in formats:
+        sidecar = f"{path}.{fmt}"
+        try:
+            if os.stat(sidecar).st_mtime_ns == source_stat.st_mtime_ns:
+                stats["fresh"] += 1
+                continue
+        except FileNotFoundError:
+            pass
+
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        compressed = COMPRESSORS[fmt](data) if len(data) >= MIN_SIZE else None
+
+        if compressed is None or len(compressed) > len(data) * MAX_RATIO:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            stats["not_worth_it"] += 1
+            continue
+
+        tmp_path = sidecar + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        # The sidecar carries its source's mtime, which is how later builds tell it is up to date.
+        os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_path, sidecar)
+        stats["written"] += 1
+        logger.debug("Compressed: %s", sidecar)
+
+    return stats
+
+
+def compress_tree(root, formats=None, jobs=1, extensions=COMPRESSIBLE_EXTENSIONS):
+    formats = available_formats() if formats is None else tuple(formats)
+    unknown = [fmt for fmt in formats if fmt not in COMPRESSORS]
+    if unknown:
+        raise ValueError(f"Unsupported compression format(s): {', '.join(unknown)}")
+
+    sources = []
+    stats = Counter()
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for name in sorted(file_names):
+            path = os.path.join(dir_path, name)
+            if name.endswith(extensions):
+                sources.append(path)
+                continue
+            base, ext = os.path.splitext(path)
+            # Only sidecars of files we would compress count as orphans, never e.g. a static .tar.gz.
+            if ext[1:] in COMPRESSORS and base.endswith(extensions) and not os.path.exists(base):
+                os.remove(path)
+                stats["removed"] += 1
+
+    # zlib and brotli release the GIL while compressing, so threads are enough.
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for file_stats in executor.map(lambda path: compress_file(path, formats), sources):
+            stats += file_stats
+    return stats
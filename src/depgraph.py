@@ -0,0 +1,129 @@
+import os
+import posixpath
+from assets import split_url
+from manifest import load_versioned_json, save_versioned_json
+from misc import extract_markdown_images, extract_markdown_links
+
+GRAPH_VERSION = 1
+
+
+def is_local_url(url):
+    return url != "" and not url.startswith("#") and ":" not in url.split("/", 1)[0]
+
+
+def resolve_url(url, page_url_dir):
+    path = split_url(url)[0]
+    if not path.startswith("/"):
+        path = posixpath.join(page_url_dir, path)
+    return posixpath.normpath(path).lstrip("/")
+
+
+def page_candidates(rel_path):
+    # A link to /blog can be served by blog.md or blog/index.md.
+    if rel_path in ("", "."):
+        return ["index.md"]
+    if rel_path.endswith(".html"):
+        return [rel_path[: -len(".html")] + ".md"]
+    return [rel_path + ".md", posixpath.join(rel_path, "index.md")]
+
+
+def markdown_urls(markdown):
+    # (image URLs, link URLs): all a page's dependencies are derived from these.
+    return [url for _, url in extract_markdown_images(markdown)], [url for _, url in extract_markdown_links(markdown)]
+
+
+class DependencyGraph:
+    def __init__(self, path, content_dir, static_dir, pages=None):
+        self.path = path
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        # Maps a page's markdown source to its output and everything that output was built from.
+        self.pages = pages if pages is not None else {}
+        self._dependents = None
+
+    @classmethod
+    def load(cls, path, content_dir, static_dir):
+        data = load_versioned_json(path, GRAPH_VERSION)
+        if data is None:
+            return cls(path, content_dir, static_dir)
+        return cls(path, content_dir, static_dir, data.get("pages", {}))
+
+    def save(self):
+        save_versioned_json(self.path, GRAPH_VERSION, {"pages": self.pages}, indent=2)
+
+    def page_dependencies(self, source_path, markdown):
+        return self.url_dependencies(source_path, *markdown_urls(markdown))
+
+    def url_dependencies(self, source_path, image_urls, link_urls):
+        rel_dir = os.path.relpath(os.path.dirname(source_path), self.content_dir)
+        page_url_dir = "/" if rel_dir == "." else "/" + rel_dir.replace(os.sep, "/")
+
+        assets = set()
+        for url in image_urls:
+            if is_local_url(url):
+                assets.add(os.path.join(self.static_dir, *resolve_url(url, page_url_dir).split("/")))
+        links = set()
+        for url in link_urls:
+            if not is_local_url(url):
+                continue
+            rel_path = resolve_url(url, page_url_dir)
+            if posixpath.splitext(rel_path)[1] not in ("", ".html", ".md"):
+                # Links to static files are fingerprinted like images are.
+                assets.add(os.path.join(self.static_dir, *rel_path.split("/")))
+                continue
+            for candidate in page_candidates(rel_path):
+                links.add(os.path.join(self.content_dir, *candidate.split("/")))
+        links.discard(source_path)
+        return sorted(assets), sorted(links)
+
+    def record(self, source_path, dest_path, template_path, markdown):
+        self.record_urls(source_path, dest_path, template_path, *markdown_urls(markdown))
+
+    def record_urls(self, source_path, dest_path, template_path, image_urls, link_urls):
+        assets, links = self.url_dependencies(source_path, image_urls, link_urls)
+        self.pages[source_path] = {"dest": dest_path, "template": template_path, "assets": assets, "links": links}
+        self._dependents = None
+
+    def prune(self, sources):
+        sources = set(sources)
+        removed = [source for source in self.pages if source not in sources]
+        for source in removed:
+            del self.pages[source]
+        if removed:
+            self._dependents = None
+        return removed
+
+    def _build_reverse_edges(self):
+        dependents = {}
+        linked_from = {}
+        for source, entry in self.pages.items():
+            for dependency in [entry["template"], *entry["assets"]]:
+                dependents.setdefault(dependency, set()).add(source)
+            for target in entry["links"]:
+                linked_from.setdefault(target, set()).add(source)
+        self._dependents = (dependents, linked_from)
+
+    def affected(self, changed, added_or_removed=()):
+        if self._dependents is None:
+            self._build_reverse_edges()
+        dependents, linked_from = self._dependents
+        pages = set()
+        for path in changed:
+            if path in self.pages:
+                pages.add(path)
+            pages.update(dependents.get(path, ()))
+        # A link's href is written verbatim, so linking pages only care whether the target exists.
+        for path in added_or_removed:
+            pages.update(dependents.get(path, ()))
+            pages.update(linked_from.get(path, ()))
+        return pages
+
+    def dump(self):
+        lines = []
+        for source in sorted(self.pages):
+            entry = self.pages[source]
+            lines.append(f"{source} → {entry['dest']}")
+            lines.append(f"    template: {entry['template']}")
+            lines.extend(f"    asset:    {path}" for path in entry["assets"])
+            lines.extend(f"    link:     {path}" for path in entry["links"])
+        return "\n".join(lines)
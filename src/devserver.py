@@ -0,0 +1,236 @@
+import functools
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from discovery import scan_tree
+from initilizer import generate_page
+from template import Template
+
+logger = logging.getLogger(__name__)
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + LIVERELOAD_PATH + "\")"
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+
+def inject_livereload(html):
+    index = html.rfind("</body>")
+    if index == -1:
+        return html + LIVERELOAD_SCRIPT
+    return html[:index] + LIVERELOAD_SCRIPT + html[index:]
+
+
+class ReloadBroadcaster:
+    def __init__(self):
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        client = queue.Queue()
+        with self.lock:
+            self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def reload(self):
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.put("reload")
+        return len(clients)
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, broadcaster=None, **kwargs):
+        self.broadcaster = broadcaster
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH:
+            self.stream_reloads()
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+
+        with open(path, "r", encoding="utf-8") as f:
+            body = inject_livereload(f.read()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        client = self.broadcaster.subscribe()
+        try:
+            while True:
+                try:
+                    message = client.get(timeout=15)
+                    self.wfile.write(f"data: {message}\n\n".encode("utf-8"))
+                except queue.Empty:
+                    # Comment lines keep the connection alive and surface disconnects.
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.broadcaster.unsubscribe(client)
+
+    def log_message(self, format, *args):
+        if self.path != LIVERELOAD_PATH:
+            super().log_message(format, *args)
+
+
+def snapshot(*roots, exclude=()):
+    # Directories are scanned like a build scans them, so ignored files never trigger a rebuild.
+    files = {}
+    for root in roots:
+        if os.path.isfile(root):
+            stat = os.stat(root)
+            files[root] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        if not os.path.isdir(root):
+            continue
+        for _, entry in scan_tree(root, exclude=exclude).files:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class SiteWatcher:
+    def __init__(self, content_dir, static_dir, template_path, public_dir, cache=None, exclude=(), assets=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.public_dir = public_dir
+        self.cache = cache
+        self.exclude = exclude
+        # The build's asset manifest, so rebuilt pages get the same image markup as built ones.
+        self.assets = assets
+        self.template = self.load_template()
+        self.files = self.snapshot()
+
+    def load_template(self):
+        template = Template.load(self.template_path)
+        if self.assets is not None:
+            template = Template(self.assets.rewrite_html(template.source), name=template.name)
+        return template
+
+    def snapshot(self):
+        return snapshot(self.content_dir, self.static_dir, self.template_path, exclude=self.exclude)
+
+    def poll(self):
+        current = self.snapshot()
+        changed = {path for path, state in current.items() if self.files.get(path) != state}
+        removed = set(self.files) - set(current)
+        self.files = current
+        return changed, removed
+
+    def page_dest(self, content_path):
+        rel_path = os.path.relpath(content_path, self.content_dir)
+        return os.path.join(self.public_dir, rel_path[: -len(".md")] + ".html")
+
+    def static_dest(self, static_path):
+        return os.path.join(self.public_dir, os.path.relpath(static_path, self.static_dir))
+
+    def is_page(self, path):
+        return path.endswith(".md") and is_within(path, self.content_dir)
+
+    def rebuild(self, changed, removed):
+        outputs = []
+        pages = {path for path in changed if self.is_page(path)}
+        if self.template_path in changed:
+            self.template = self.load_template()
+            pages = {path for path in self.files if self.is_page(path)}
+
+        for path in sorted(pages):
+            dest_path = self.page_dest(path)
+            if generate_page(path, self.template, dest_path, cache=self.cache, assets=self.assets)["written"]:
+                outputs.append(dest_path)
+
+        for path in sorted(changed):
+            if is_within(path, self.static_dir):
+                dest_path = self.static_dest(path)
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                shutil.copy2(path, dest_path)
+                outputs.append(dest_path)
+
+        for path in sorted(removed):
+            if self.is_page(path):
+                dest_path = self.page_dest(path)
+            elif is_within(path, self.static_dir):
+                dest_path = self.static_dest(path)
+            else:
+                continue
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+                outputs.append(dest_path)
+
+        return outputs
+
+    def latest_mtime(self, paths):
+        mtimes = [self.files[path][0] for path in paths if path in self.files]
+        return max(mtimes) / 1e9 if mtimes else time.time()
+
+
+def is_within(path, root):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(root)]) == os.path.abspath(root)
+
+
+def serve(public_dir, port=8888, watcher=None, interval=0.5):
+    broadcaster = ReloadBroadcaster()
+    handler = functools.partial(LiveReloadHandler, directory=public_dir, broadcaster=broadcaster)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info("🌐 Serving %s at http://localhost:%s/", public_dir, server.server_address[1])
+
+    try:
+        while True:
+            time.sleep(interval)
+            if watcher is None:
+                continue
+            changed, removed = watcher.poll()
+            if not changed and not removed:
+                continue
+            saved_at = watcher.latest_mtime(changed)
+            try:
+                outputs = watcher.rebuild(changed, removed)
+            except Exception as e:
+                logger.error("❌ Rebuild failed: %s", e)
+                continue
+            clients = broadcaster.reload()
+            logger.info(
+                "🔁 Rebuilt %d file(s), reloaded %d browser(s), %.0f ms after save",
+                len(outputs),
+                clients,
+                (time.time() - saved_at) * 1000,
+            )
+    except KeyboardInterrupt:
+        logger.info("👋 Stopping server")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,163 @@
+import logging
+import os
+import re
+from operator import attrgetter
+
+logger = logging.getLogger(__name__)
+
+IGNORE_FILE = ".siteignore"
+
+
+def translate_pattern(pattern):
+    # gitignore glob → regex over a "/"-separated path relative to the scan root.
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            close = pattern.find("]", index + 2)
+            if close == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1 : close]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                index = close
+        elif char == "\\" and index + 1 < len(pattern):
+            index += 1
+            parts.append(re.escape(pattern[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+class IgnoreRules:
+    def __init__(self, patterns=()):
+        # (regex, negated, directories only); the last rule that matches a path wins.
+        self.rules = []
+        for pattern in patterns:
+            self.add(pattern)
+
+    @classmethod
+    def load(cls, path, extra=()):
+        rules = cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    rules.add(line)
+        except FileNotFoundError:
+            pass
+        for pattern in extra:
+            rules.add(pattern)
+        return rules
+
+    def add(self, pattern):
+        pattern = pattern.rstrip("\n").rstrip(" ")
+        if pattern == "" or pattern.startswith("#"):
+            return
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # A slash anywhere but the end anchors the pattern to the root; otherwise it matches a name at any depth.
+        if "/" in pattern:
+            regex = translate_pattern(pattern.lstrip("/"))
+        else:
+            regex = "(?:.*/)?" + translate_pattern(pattern)
+        self.rules.append((re.compile(regex + r"\Z", re.DOTALL), negated, dir_only))
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def is_ignored(self, rel_path, is_dir=False):
+        ignored = False
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                ignored = not negated
+        return ignored
+
+
+class SourceTree:
+    def __init__(self, root, files, dirs):
+        self.root = root
+        # (relative path, os.DirEntry) pairs; the entries keep the stat info scandir already read.
+        self.files = files
+        self.dirs = dirs
+
+    def __len__(self):
+        return len(self.files)
+
+    def paths(self, suffixes=None):
+        return [
+            (rel_path, entry.path)
+            for rel_path, entry in self.files
+            if suffixes is None or rel_path.endswith(suffixes)
+        ]
+
+
+def sorted_entries(dir_path):
+    with os.scandir(dir_path) as entries:
+        return sorted(entries, key=attrgetter("name"))
+
+
+def dir_key(stat_result):
+    return stat_result.st_dev, stat_result.st_ino
+
+
+def scan_tree(root, ignore=None, exclude=()):
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Source directory '{root}' not found!")
+    if ignore is None:
+        ignore = IgnoreRules.load(os.path.join(root, IGNORE_FILE), exclude)
+
+    files = []
+    dirs = []
+    top = [entry for entry in sorted_entries(root) if entry.name != IGNORE_FILE]
+    # Depth first through name-sorted directories, so results come out sorted
+    # by path components without a final sort.
+    root_key = dir_key(os.stat(root))
+    stack = [("", iter(top), root_key)]
+    # The directories being descended into; a symlink back to any of them,
+    # directly or through other links, would never end.
+    descending = {root_key}
+    while stack:
+        prefix, entries, key = stack[-1]
+        for entry in entries:
+            rel_path = prefix + entry.name
+            # d_type answers these without a stat call on most filesystems; only
+            # symlinks and directories are stat'ed.
+            is_dir = entry.is_dir()
+            if ignore and ignore.is_ignored(rel_path.replace(os.sep, "/"), is_dir):
+                continue
+            if is_dir:
+                entry_key = dir_key(entry.stat())
+                if entry_key in descending:
+                    logger.warning("⚠️  Skipping symlink to a directory already being scanned: %s", entry.path)
+                    continue
+                dirs.append(rel_path)
+                descending.add(entry_key)
+                stack.append((rel_path + os.sep, iter(sorted_entries(entry.path)), entry_key))
+                break
+            if entry.is_file():
+                files.append((rel_path, entry))
+        else:
+            stack.pop()
+            descending.discard(key)
+    return SourceTree(root, files, dirs)
@@ -0,0 +1,183 @@
+import json
+import re
+from datetime import date, datetime
+from misc import extract_title
+
+# The opening line picks the syntax: YAML-lite between ---, TOML-lite between +++.
+DELIMITERS = {"---": "yaml", "+++": "toml"}
+
+KEY = r"([A-Za-z_][\w-]*)"
+LINE_RES = {
+    "yaml": re.compile(KEY + r"[ \t]*:(?:[ \t]+(.*))?"),
+    "toml": re.compile(KEY + r"[ \t]*=[ \t]*(.*)"),
+}
+YAML_ITEM_RE = re.compile(r"[ \t]*-[ \t]+(.*)")
+ARRAY_ITEM_RE = re.compile(r"\"(?:\\.|[^\"\\])*\"|'[^']*'|[^,\s][^,]*")
+INT_RE = re.compile(r"[-+]?\d+")
+FLOAT_RE = re.compile(r"[-+]?(?:\d+\.\d*|\.\d+|\d+(?:\.\d*)?[eE][-+]?\d+)")
+
+
+class FrontMatterError(ValueError):
+    def __init__(self, line_number, line, reason):
+        super().__init__(f"Invalid front matter on line {line_number}: {reason}: {line!r}")
+        self.line_number = line_number
+
+
+def parse_scalar(text, line_number=0):
+    text = text.strip()
+    if text[:1] not in ("'", '"', "["):
+        text = text.split(" #", 1)[0].rstrip()
+    if text.startswith('"'):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            raise FrontMatterError(line_number, text, "unterminated string") from None
+    if text.startswith("'"):
+        if len(text) < 2 or not text.endswith("'"):
+            raise FrontMatterError(line_number, text, "unterminated string")
+        return text[1:-1].replace("''", "'")
+    if text.startswith("["):
+        if not text.endswith("]"):
+            raise FrontMatterError(line_number, text, "unterminated list")
+        return [parse_scalar(item, line_number) for item in ARRAY_ITEM_RE.findall(text[1:-1])]
+    lowered = text.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if lowered in ("null", "~", ""):
+        return None
+    if INT_RE.fullmatch(text):
+        return int(text)
+    if FLOAT_RE.fullmatch(text):
+        return float(text)
+    return text
+
+
+def parse_header(lines, syntax, first_line_number=2):
+    metadata = {}
+    line_re = LINE_RES[syntax]
+    list_key = None
+    for line_number, line in enumerate(lines, first_line_number):
+        line = line.rstrip()
+        if not line or line.lstrip().startswith("#"):
+            continue
+        if list_key is not None:
+            # A bare "key:" followed by "- item" lines is a block list.
+            item = YAML_ITEM_RE.fullmatch(line)
+            if item is not None:
+                metadata[list_key].append(parse_scalar(item.group(1), line_number))
+                continue
+            if not metadata[list_key]:
+                metadata[list_key] = None
+            list_key = None
+        match = line_re.fullmatch(line)
+        if match is None:
+            raise FrontMatterError(line_number, line, f"expected a {syntax.upper()} key and value")
+        key, value = match.groups()
+        if syntax == "yaml" and not value:
+            metadata[key] = []
+            list_key = key
+            continue
+        metadata[key] = parse_scalar(value, line_number)
+    if list_key is not None and not metadata[list_key]:
+        metadata[list_key] = None
+    return metadata
+
+
+def closing_line(lines, delimiter):
+    for index, line in enumerate(lines):
+        if line.rstrip() == delimiter:
+            return index
+    return -1
+
+
+def split_front_matter(markdown):
+    # Returns (metadata, body). An unclosed block is left alone: a lone --- is a thematic break.
+    first_line_end = markdown.find("\n")
+    if first_line_end == -1:
+        return {}, markdown
+    syntax = DELIMITERS.get(markdown[:first_line_end].rstrip())
+    if syntax is None:
+        return {}, markdown
+    lines = markdown[first_line_end + 1 :].split("\n")
+    close = closing_line(lines, markdown[:3])
+    if close == -1:
+        return {}, markdown
+    return parse_header(lines[:close], syntax), "\n".join(lines[close + 1 :])
+
+
+def read_front_matter(path):
+    # Reads only as far as the closing delimiter, and decodes line by line,
+    # so the body is never loaded or decoded.
+    with open(path, "rb") as f:
+        first = f.readline().decode("utf-8").rstrip()
+        syntax = DELIMITERS.get(first)
+        if syntax is None:
+            return {}
+        lines = []
+        for line in f:
+            line = line.decode("utf-8")
+            if line.rstrip() == first:
+                return parse_header(lines, syntax)
+            lines.append(line)
+    return {}
+
+
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return None
+
+
+class Page:
+    # Everything is loaded on first use: metadata alone reads only the header,
+    # so listing or sorting pages never loads their bodies.
+    def __init__(self, source_path, markdown=None):
+        self.source_path = source_path
+        self._markdown = markdown
+        self._metadata = None
+        self._body = None
+
+    @property
+    def markdown(self):
+        if self._markdown is None:
+            with open(self.source_path, "r", encoding="utf-8") as f:
+                self._markdown = f.read()
+        return self._markdown
+
+    def _split(self):
+        self._metadata, self._body = split_front_matter(self.markdown)
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            if self._markdown is None:
+                self._metadata = read_front_matter(self.source_path)
+            else:
+                self._split()
+        return self._metadata
+
+    @property
+    def body(self):
+        if self._body is None:
+            self._split()
+        return self._body
+
+    @property
+    def title(self):
+        title = self.metadata.get("title")
+        if title is not None:
+            return str(title)
+        return extract_title(self.body)
+
+    @property
+    def date(self):
+        return parse_date(self.metadata.get("date"))
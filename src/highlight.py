@@ -0,0 +1,176 @@
+import re
+from leafnode import LeafNode
+from manifest import hash_bytes
+
+# Bump when a lexer or the markup it produces changes so memoized results and
+# cached page bodies are rebuilt.
+HIGHLIGHTER_VERSION = 1
+DEFAULT_MAX_ENTRIES = 4096
+
+# Short class names as used by Pygments, so its stylesheets apply unchanged.
+KEYWORD = "k"
+CONSTANT = "kc"
+BUILTIN = "nb"
+DECORATOR = "nd"
+VARIABLE = "nv"
+STRING = "s"
+NUMBER = "m"
+COMMENT = "c"
+
+
+def words(names):
+    return r"\b(?:" + "|".join(names) + r")\b"
+
+
+class RegexLexer:
+    def __init__(self, rules, flags=0):
+        # Rules are tried in order at each position; text no rule matches stays plain.
+        self.token_types = [token_type for token_type, _ in rules]
+        self.regex = re.compile("|".join(f"({pattern})" for _, pattern in rules), flags)
+
+    def tokenize(self, code):
+        position = 0
+        for match in self.regex.finditer(code):
+            if match.start() == match.end():
+                continue
+            if match.start() > position:
+                yield None, code[position : match.start()]
+            yield self.token_types[match.lastindex - 1], match.group()
+            position = match.end()
+        if position < len(code):
+            yield None, code[position:]
+
+
+LEXERS = {}
+
+
+def register_lexer(lexer, *names):
+    for name in names:
+        LEXERS[name.lower()] = lexer
+
+
+def get_lexer(language):
+    return LEXERS.get(language.lower())
+
+
+register_lexer(
+    RegexLexer(
+        [
+            (COMMENT, r"#[^\n]*"),
+            (STRING, r'[rbfuRBFU]{0,2}(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')'),
+            (DECORATOR, r"@[\w.]+"),
+            (CONSTANT, words(["True", "False", "None"])),
+            (
+                KEYWORD,
+                words(
+                    "and as assert async await break class continue def del elif else except finally for from "
+                    "global if import in is lambda nonlocal not or pass raise return try while with yield".split()
+                ),
+            ),
+            (
+                BUILTIN,
+                words(
+                    "abs all any bool dict enumerate float int isinstance len list map max min open print "
+                    "range repr set sorted str sum super tuple type zip self".split()
+                ),
+            ),
+            (NUMBER, r"\b(?:0[xob][\da-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?j?)\b"),
+        ]
+    ),
+    "python",
+    "py",
+)
+
+register_lexer(
+    RegexLexer(
+        [
+            (COMMENT, r"//[^\n]*|/\*[\s\S]*?\*/"),
+            (STRING, r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`'),
+            (CONSTANT, words(["true", "false", "null", "undefined", "NaN", "Infinity"])),
+            (
+                KEYWORD,
+                words(
+                    "async await break case catch class const continue default delete do else export extends "
+                    "finally for from function if import in instanceof let new of return static switch this "
+                    "throw try typeof var void while yield".split()
+                ),
+            ),
+            (BUILTIN, words(["Array", "Object", "Promise", "JSON", "Math", "console", "document", "window"])),
+            (NUMBER, r"\b(?:0[xob][\da-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?n?)\b"),
+        ]
+    ),
+    "javascript",
+    "js",
+    "typescript",
+    "ts",
+)
+
+register_lexer(
+    RegexLexer(
+        [
+            (COMMENT, r"(?:^|(?<=\s))#[^\n]*"),
+            (STRING, r'"(?:\\.|[^"\\])*"|\'[^\']*\''),
+            (VARIABLE, r"\$(?:\{[^}\n]*\}|\w+|[@#?$!*-])"),
+            (
+                KEYWORD,
+                words("case do done elif else esac fi for function if in local return select then until while".split()),
+            ),
+            (BUILTIN, words("cd echo exit export printf read set shift source test trap unset".split())),
+        ]
+    ),
+    "bash",
+    "sh",
+    "shell",
+    "console",
+)
+
+register_lexer(
+    RegexLexer(
+        [
+            (STRING, r'"(?:\\.|[^"\\\n])*"'),
+            (CONSTANT, words(["true", "false", "null"])),
+            (NUMBER, r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+        ]
+    ),
+    "json",
+)
+
+
+class HighlightCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, language, code):
+        return (language.lower(), hash_bytes(code.encode("utf-8")), HIGHLIGHTER_VERSION)
+
+    def highlight(self, code, language):
+        # Returns the children for a <code> element, or None when no lexer knows the language.
+        lexer = get_lexer(language)
+        if lexer is None:
+            return None
+        key = self.key(language, code)
+        nodes = self.entries.get(key)
+        if nodes is not None:
+            self.hits += 1
+            return list(nodes)
+
+        self.misses += 1
+        nodes = tuple(
+            LeafNode(None, text) if token_type is None else LeafNode("span", text, {"class": token_type})
+            for token_type, text in lexer.tokenize(code)
+        )
+        if len(self.entries) >= self.max_entries:
+            # Oldest first: snippets repeated across pages are hit again long before they age out.
+            del self.entries[next(iter(self.entries))]
+        self.entries[key] = nodes
+        return list(nodes)
+
+
+highlight_cache = HighlightCache()
+
+
+def highlight_code(code, language):
+    return highlight_cache.highlight(code, language)
@@ -1,20 +1,96 @@
+from types import MappingProxyType
+
+# Shared, read-only defaults so leaves don't each allocate an empty list and dict.
+EMPTY_CHILDREN = ()
+EMPTY_PROPS = MappingProxyType({})
+
+
+# Only "&" and "<" can start markup in text, and only "&" and '"' can end a
+# double-quoted attribute early, so those are all that need escaping.
+def escape_text(text):
+    text = str(text)
+    # Most text has nothing to escape; checking first skips the replace() copies.
+    if "&" in text or "<" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;")
+    return text
+
+
+def escape_attr(value):
+    value = str(value)
+    if "&" in value or '"' in value:
+        return value.replace("&", "&amp;").replace('"', "&quot;")
+    return value
+
+
+def render_attrs(props):
+    # A plain loop: nodes have one or two props, too few for a generator and join to pay off.
+    attrs = ""
+    for key, value in props.items():
+        if value is None:
+            continue
+        if value.__class__ is not str or "&" in value or '"' in value:
+            value = escape_attr(value)
+        attrs += f' {key}="{value}"'
+    return attrs
+
+
 class HTMLNode:
+    __slots__ = ("tag", "_value", "_html", "children", "_props", "_attrs")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
-        self.value = value
-        self.children = children if children is not None else []
-        self.props = props if props is not None else {}
+        # The value setter, inlined: this runs for every node of every page.
+        self._value = value
+        if value is None:
+            self._html = None
+        elif value.__class__ is str and "&" not in value and "<" not in value:
+            self._html = value
+        else:
+            self._html = escape_text(value)
+        self.children = children if children is not None else EMPTY_CHILDREN
+        if props is None:
+            # Most nodes have no props; their attribute string is known up front.
+            self._props = EMPTY_PROPS
+            self._attrs = ""
+        else:
+            self.props = props
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        # Escaped once when the text is set, so rendering costs no more than it did unescaped.
+        self._value = value
+        self._html = escape_text(value) if value is not None else None
+
+    @property
+    def props(self):
+        return self._props
+
+    @props.setter
+    def props(self, props):
+        # Kept as a read-only copy: editing it in place raises instead of leaving the
+        # attribute string stale, so changes have to go through this setter.
+        self._props = MappingProxyType(dict(props))
+        self._attrs = render_attrs(self._props)
 
     def to_html(self):
         raise NotImplementedError("Subclasses must implement to_html")
 
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_html(self, fp):
+        for fragment in self.iter_html():
+            fp.write(fragment)
+
     def props_to_html(self):
-        if not self.props:
-            return ""
-        return " " + " ".join(f'{key}="{value}"' for key, value in self.props.items() if value is not None)
+        return self._attrs
     
     def __repr__(self):
         return (
             f"HTMLNode(tag={self.tag}, value={self.value}, "
-            f"children={self.children}, props={self.props})"
+            f"children={list(self.children)}, props={dict(self.props)})"
         )
\ No newline at end of file
@@ -0,0 +1,296 @@
+import io
+import json
+import logging
+import os
+import shutil
+import struct
+import zlib
+from collections import Counter
+from manifest import hash_bytes, hash_file
+from discovery import scan_tree
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the optimizer's output changes so cached results are rebuilt.
+IMAGE_PIPELINE_VERSION = 1
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+VARIANT_WIDTHS = (480, 960, 1600)
+INDEX_NAME = "index.json"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Metadata chunks that don't affect how the image is displayed.
+PNG_DROPPED_CHUNKS = (b"tEXt", b"zTXt", b"iTXt", b"tIME")
+# SOFn markers carry the frame size; C4, C8 and CC share the range but are not frames.
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def can_resize():
+    return Image is not None
+
+
+def can_encode_webp():
+    return Image is not None and features.check("webp")
+
+
+def image_size(data):
+    if data.startswith(PNG_SIGNATURE):
+        if data[12:16] != b"IHDR":
+            raise ValueError("PNG is missing its IHDR chunk")
+        return struct.unpack(">II", data[16:24])
+    if data.startswith(b"\xff\xd8"):
+        return jpeg_size(data)
+    raise ValueError("Unsupported image format")
+
+
+def jpeg_size(data):
+    index = 2
+    while index + 4 <= len(data):
+        if data[index] != 0xFF:
+            raise ValueError("Malformed JPEG marker")
+        marker = data[index + 1]
+        if marker == 0xFF:
+            index += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            index += 2
+            continue
+        (length,) = struct.unpack(">H", data[index + 2 : index + 4])
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[index + 5 : index + 9])
+            return width, height
+        index += 2 + length
+    raise ValueError("JPEG has no frame header")
+
+
+def iter_png_chunks(data):
+    index = len(PNG_SIGNATURE)
+    while index < len(data):
+        (length,) = struct.unpack(">I", data[index : index + 4])
+        chunk_type = data[index + 4 : index + 8]
+        yield chunk_type, data[index + 8 : index + 8 + length]
+        index += 12 + length
+        if chunk_type == b"IEND":
+            return
+
+
+def png_chunk(chunk_type, payload):
+    crc = zlib.crc32(chunk_type + payload)
+    return struct.pack(">I", len(payload)) + chunk_type + payload + struct.pack(">I", crc)
+
+
+def optimize_png(data):
+    # Lossless: the filtered scanlines are kept as-is, only the deflate stream is redone.
+    chunks = []
+    idat = []
+    for chunk_type, payload in iter_png_chunks(data):
+        if chunk_type == b"IDAT":
+            if not idat:
+                chunks.append((b"IDAT", None))
+            idat.append(payload)
+        elif chunk_type not in PNG_DROPPED_CHUNKS:
+            chunks.append((chunk_type, payload))
+
+    raw = zlib.decompress(b"".join(idat))
+    best = None
+    for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        candidate = compressor.compress(raw) + compressor.flush()
+        if best is None or len(candidate) < len(best):
+            best = candidate
+
+    out = [PNG_SIGNATURE]
+    for chunk_type, payload in chunks:
+        out.append(png_chunk(chunk_type, best if payload is None else payload))
+    optimized = b"".join(out)
+    return optimized if len(optimized) < len(data) else data
+
+
+def optimize_image(data, ext):
+    if ext == ".png":
+        return optimize_png(data)
+    if Image is not None:
+        # quality="keep" reuses the source's quantization tables, so this only re-does the entropy coding.
+        buffer = io.BytesIO()
+        with Image.open(io.BytesIO(data)) as image:
+            image.save(buffer, "JPEG", quality="keep", optimize=True, progressive=True)
+        optimized = buffer.getvalue()
+        if len(optimized) < len(data):
+            return optimized
+    return data
+
+
+def encode_variant(data, width, fmt):
+    buffer = io.BytesIO()
+    with Image.open(io.BytesIO(data)) as image:
+        if width < image.width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+        if fmt == "webp":
+            image.save(buffer, "WEBP", quality=80, method=6)
+        elif fmt == "png":
+            image.save(buffer, "PNG", optimize=True)
+        else:
+            image.convert("RGB").save(buffer, "JPEG", quality=85, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def variant_name(name, width, ext):
+    base = os.path.splitext(name)[0]
+    if width is None:
+        return base + ext
+    return f"{base}-{width}w{ext}"
+
+
+class ImageCache:
+    def __init__(self, cache_dir, widths=VARIANT_WIDTHS):
+        self.cache_dir = cache_dir
+        self.widths = tuple(widths)
+        # Whatever can be produced here is part of the key, so installing Pillow rebuilds the cache.
+        self.salt = f"{IMAGE_PIPELINE_VERSION}\0{self.widths}\0{can_resize()}\0{can_encode_webp()}"
+        self.hits = 0
+        self.misses = 0
+
+    def entry_dir(self, source_hash, ext):
+        key = hash_bytes(f"{self.salt}\0{source_hash}\0{ext}".encode("utf-8"))
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def process(self, src_path, ext):
+        source_hash = hash_file(src_path)
+        entry_dir = self.entry_dir(source_hash, ext)
+        meta_path = os.path.join(entry_dir, "meta.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.hits += 1
+            return entry_dir, meta
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        self.misses += 1
+        with open(src_path, "rb") as f:
+            data = f.read()
+        width, height = image_size(data)
+        outputs = {f"full{ext}": optimize_image(data, ext)}
+        variants = []
+        if can_resize():
+            for variant_width in self.widths:
+                if variant_width < width:
+                    file_name = f"{variant_width}{ext}"
+                    outputs[file_name] = encode_variant(data, variant_width, ext.lstrip(".").replace("jpg", "jpeg"))
+                    variants.append([variant_width, ext, file_name])
+            variants.append([None, ext, f"full{ext}"])
+        if can_encode_webp():
+            for variant_width in [w for w in self.widths if w < width] + [None]:
+                file_name = f"{variant_width or 'full'}.webp"
+                outputs[file_name] = encode_variant(data, variant_width or width, "webp")
+                variants.append([variant_width, ".webp", file_name])
+        meta = {"width": width, "height": height, "variants": variants}
+
+        os.makedirs(entry_dir, exist_ok=True)
+        for file_name, output in outputs.items():
+            with open(os.path.join(entry_dir, file_name), "wb") as f:
+                f.write(output)
+        # meta.json goes last: its presence marks the entry as complete.
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        return entry_dir, meta
+
+
+def _place_output(src_path, dest_path):
+    try:
+        if os.path.getsize(dest_path) == os.path.getsize(src_path) and hash_file(dest_path) == hash_file(src_path):
+            return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    # Copy then rename so a hard-linked static file is replaced rather than edited in place.
+    tmp_path = dest_path + ".tmp"
+    shutil.copyfile(src_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+    return True
+
+
+def load_image_index(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_image_index(path, images):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(images, f, indent=2, sort_keys=True)
+
+
+def is_image(rel_path):
+    return os.path.splitext(rel_path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def image_paths(tree):
+    # The static files optimize_images publishes itself, over the copy of the original.
+    return {rel_path for rel_path, _ in tree.files if is_image(rel_path)}
+
+
+def changed_images(previous, images):
+    # Source URLs whose size or variants differ from the previous build's index.
+    return sorted(url for url in previous.keys() | images.keys() if previous.get(url) != images.get(url))
+
+
+def optimize_images(src, dest, cache_dir, assets=None, previous=None, widths=VARIANT_WIDTHS, tree=None):
+    if tree is None:
+        tree = scan_tree(src)
+
+    cache = ImageCache(cache_dir, widths)
+    stats = Counter()
+    images = {}
+    for rel_path, src_path in tree.paths():
+        rel_dir, name = os.path.split(rel_path)
+        url_dir = "/" + rel_dir.replace(os.sep, "/") if rel_dir else ""
+        if not is_image(name):
+            continue
+        ext = os.path.splitext(name)[1].lower()
+        url = f"{url_dir}/{name}"
+        try:
+            entry_dir, meta = cache.process(src_path, ext)
+        except (ValueError, struct.error, zlib.error) as e:
+            logger.warning("⚠️  Skipping image %s: %s", src_path, e)
+            continue
+
+        # Variants sit next to the published file, so they share its fingerprint.
+        public_url = assets.url_for(url) if assets is not None else url
+        public_dir, public_name = public_url.rsplit("/", 1)
+        info = {"width": meta["width"], "height": meta["height"], "srcset": {}, "files": []}
+        for variant_width, variant_ext, file_name in [[None, ext, f"full{ext}"]] + meta["variants"]:
+            variant_url = f"{public_dir}/{variant_name(public_name, variant_width, variant_ext)}"
+            if variant_url in info["files"]:
+                continue
+            if _place_output(os.path.join(entry_dir, file_name), os.path.join(dest, variant_url.lstrip("/"))):
+                stats["written"] += 1
+                logger.debug("🖼️  Wrote %s", variant_url)
+            info["files"].append(variant_url)
+        for variant_width, variant_ext, file_name in meta["variants"]:
+            variant_url = f"{public_dir}/{variant_name(public_name, variant_width, variant_ext)}"
+            info["srcset"].setdefault(variant_ext, []).append([variant_url, variant_width or meta["width"]])
+        images[url] = info
+        stats["images"] += 1
+
+    if previous:
+        current = {file for info in images.values() for file in info["files"]}
+        for info in previous.values():
+            for url in info.get("files", []):
+                stale_path = os.path.join(dest, url.lstrip("/"))
+                if url not in current and os.path.exists(stale_path):
+                    os.remove(stale_path)
+                    stats["removed"] += 1
+
+    stats["cache_hits"] = cache.hits
+    stats["cache_misses"] = cache.misses
+    return images, stats
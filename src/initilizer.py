@@ -1,68 +1,523 @@
+import logging
 import os
 import shutil
-from misc import markdown_to_html_node, extract_title
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from misc import PARSER_VERSION, extract_title, parse_markdown
+from frontmatter import split_front_matter
+from htmlnode import escape_text
+from highlight import HIGHLIGHTER_VERSION, highlight_cache
+from manifest import hash_bytes, hash_file
+from template import Template
+from profiler import NULL_PROFILER, BuildProfiler
+from siteindex import page_facts, page_url
+from depgraph import markdown_urls
+from discovery import scan_tree
 
-def copy_static(src, dest):
-    if not os.path.exists(src):
-        raise FileNotFoundError(f"Source directory '{src}' not found!")
+logger = logging.getLogger(__name__)
 
-    if os.path.exists(dest):
-        shutil.rmtree(dest)
-    os.makedirs(dest) 
+FICLONE = 0x40049409
 
-    for item in os.listdir(src):
-        src_path = os.path.join(src, item)
-        dest_path = os.path.join(dest, item)
+LINK_MODES = ("copy", "reflink", "hardlink")
 
-        if os.path.isdir(src_path):
-            os.makedirs(dest_path, exist_ok=True)
-            copy_static(src_path, dest_path)
+
+class PageGenerationError(Exception):
+    def __init__(self, source_path, error):
+        super().__init__(f"❌ Failed to generate page from {source_path}: {error}")
+        self.source_path = source_path
+
+
+class SyncReport:
+    def __init__(self):
+        self.copied = 0
+        self.skipped = 0
+        self.removed = 0
+        self.files = []
+        self.changed = []
+
+    def __repr__(self):
+        return f"SyncReport(copied={self.copied}, skipped={self.skipped}, removed={self.removed})"
+
+
+def _is_up_to_date(src_path, dest_path, src_stat=None):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    if src_stat is None:
+        src_stat = os.stat(src_path)
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    # Same size but different mtimes: only the content can tell.
+    if hash_file(src_path) != hash_file(dest_path):
+        return False
+    shutil.copystat(src_path, dest_path)
+    return True
+
+
+def _reflink(src_path, dest_path):
+    import fcntl
+
+    with open(src_path, "rb") as src_file, open(dest_path, "wb") as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+    shutil.copystat(src_path, dest_path)
+
+
+def _place_file(src_path, dest_path, link):
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if link == "hardlink":
+        try:
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    elif link == "reflink":
+        try:
+            _reflink(src_path, dest_path)
+            return
+        except (ImportError, OSError):
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+    shutil.copy2(src_path, dest_path)
+
+
+def sync_static(src, dest, previous_files=(), link="reflink", tree=None, owned=()):
+    if link not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {link}")
+    if tree is None:
+        tree = scan_tree(src)
+
+    report = SyncReport()
+    os.makedirs(dest, exist_ok=True)
+    for rel_dir in tree.dirs:
+        os.makedirs(os.path.join(dest, rel_dir), exist_ok=True)
+    for rel_path, entry in tree.files:
+        dest_path = os.path.join(dest, rel_path)
+        report.files.append(rel_path)
+
+        # Another stage rewrites owned outputs, so they never match the source; the copy only seeds them.
+        if rel_path in owned and os.path.exists(dest_path):
+            report.skipped += 1
+            continue
+        if _is_up_to_date(entry.path, dest_path, entry.stat()):
+            report.skipped += 1
+            continue
+        _place_file(entry.path, dest_path, link)
+        report.copied += 1
+        report.changed.append(rel_path)
+        logger.debug("Copied: %s → %s", entry.path, dest_path)
+
+    current = set(report.files)
+    for rel_path in previous_files:
+        if rel_path in current:
+            continue
+        dest_path = os.path.join(dest, rel_path)
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+            report.removed += 1
+            report.changed.append(rel_path)
+            logger.debug("Removed: %s", dest_path)
+        _remove_empty_dirs(os.path.dirname(dest_path), dest)
+
+    return report
+
+
+def _remove_empty_dirs(dir_path, stop_at):
+    stop_at = os.path.abspath(stop_at)
+    dir_path = os.path.abspath(dir_path)
+    while dir_path != stop_at and dir_path.startswith(stop_at + os.sep):
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            return
+        dir_path = os.path.dirname(dir_path)
+
+
+def parse_body(markdown_content, assets, stats):
+    hits, misses = highlight_cache.hits, highlight_cache.misses
+    node, title = parse_markdown(markdown_content)
+    # Counted per page so the totals survive being summed from worker processes.
+    stats["highlight_hits"] += highlight_cache.hits - hits
+    stats["highlight_misses"] += highlight_cache.misses - misses
+    if assets is not None:
+        assets.rewrite_node(node)
+    return node, title
+
+
+def render_body(markdown_content, cache=None, assets=None, profiler=NULL_PROFILER, from_path=None):
+    # Returns the page body as a node tree, or as an HTML string when it came
+    # from the cache, and its H1 title, which the cache stores with the body.
+    stats = Counter()
+    title = None
+    if cache is None:
+        with profiler.stage("parse", from_path):
+            content, title = parse_body(markdown_content, assets, stats)
+    else:
+        with profiler.stage("cache", from_path):
+            salt = ""
+            if assets is not None:
+                image_urls, link_urls = markdown_urls(markdown_content)
+                salt = assets.digest_for(image_urls + link_urls)
+            key = cache.key(markdown_content, salt=salt)
+            entry = cache.get(key)
+        if entry is None:
+            stats["cache_misses"] += 1
+            with profiler.stage("parse", from_path):
+                node, title = parse_body(markdown_content, assets, stats)
+            with profiler.stage("to_html", from_path):
+                content = node.to_html()
+            with profiler.stage("cache", from_path):
+                cache.put(key, content, title)
         else:
-            shutil.copy(src_path, dest_path)
-            print(f"Copied: {src_path} → {dest_path}")
+            content, title = entry
+            stats["cache_hits"] += 1
+    return content, title, stats
+
+
+def page_title(front_matter, parsed_title, body):
+    title = front_matter.get("title")
+    if title is not None:
+        return str(title)
+    if parsed_title is not None:
+        return parsed_title
+    return extract_title(body)
+
+
+def metadata_value(value):
+    if isinstance(value, list):
+        value = ", ".join(str(item) for item in value)
+    elif value is None:
+        value = ""
+    # Escaped for both text and attribute values: templates use either.
+    return escape_text(value).replace('"', "&quot;")
+
+
+def page_context(front_matter, title, content, metadata=None):
+    # Front matter keys become placeholders with a capital first letter: author → {{ Author }}.
+    context = {key[:1].upper() + key[1:]: metadata_value(value) for key, value in front_matter.items()}
+    context["Title"] = metadata_value(title)
+    if metadata:
+        context.update(metadata)
+    context["Content"] = content
+    return context
+
+
+class OutputFile:
+    # Writes go to a temporary file next to dest_path; commit() then either
+    # drops it, when the output is unchanged, or renames it over dest_path,
+    # so readers never see a half-written page.
+    def __init__(self, dest_path):
+        self.dest_path = dest_path
+        self.tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+        dir_path = os.path.dirname(dest_path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+
+    def write(self, text):
+        return self.file.write(text)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+
+    def commit(self):
+        if same_content(self.tmp_path, self.dest_path):
+            os.remove(self.tmp_path)
+            return False
+        os.replace(self.tmp_path, self.dest_path)
+        return True
+
+
+def same_content(path, other_path):
+    # Sizes are compared first, so only same-sized files get hashed.
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+    except FileNotFoundError:
+        return False
+    return hash_file(path) == hash_file(other_path)
+
+
+def write_output(dest_path, text):
+    # Returns whether dest_path changed.
+    with OutputFile(dest_path) as f:
+        f.write(text)
+    return f.commit()
+
+
+def collect_facts(front_matter, body, title, collect):
+    # What the dependency graph ("links") and site index ("index") record for a
+    # page, taken from the text rendering already read so the source isn't read twice.
+    facts = {}
+    if "links" in collect:
+        facts["urls"] = markdown_urls(body)
+    if "index" in collect:
+        facts["index"] = page_facts(front_matter, body, title)
+    return facts
+
+
+def render_context(
+    from_path, markdown_content, template, metadata=None, cache=None, assets=None, profiler=NULL_PROFILER, collect=()
+):
+    # Everything between reading a page and writing it, shared by build_page and
+    # the pipeline. Returns (context, stats, facts); see collect_facts.
+    with profiler.stage("front_matter", from_path):
+        front_matter, body = split_front_matter(markdown_content)
+
+    content, title, stats = render_body(body, cache, assets, profiler, from_path)
+
+    with profiler.stage("title", from_path):
+        title = page_title(front_matter, title, body)
+    context = page_context(front_matter, title, content, metadata)
+    template.check_context(context)
+
+    facts = {}
+    if collect:
+        with profiler.stage("facts", from_path):
+            facts = collect_facts(front_matter, body, title, collect)
+    stats["pages"] += 1
+    return context, stats, facts
+
+
+def render_page(from_path, markdown_content, template, cache=None, assets=None, collect=(), profile=False):
+    # Returns (html, stats, facts, profiler records), like generate_page_task does for a worker.
+    profiler = BuildProfiler() if profile else NULL_PROFILER
+    context, stats, facts = render_context(
+        from_path, markdown_content, template, cache=cache, assets=assets, profiler=profiler, collect=collect
+    )
+    with profiler.stage("render", from_path):
+        html = template.render(context)
+    return html, stats, facts, profiler.records if profile else []
+
+
+def generate_page(from_path, template, dest_path, metadata=None, cache=None, profiler=None, assets=None):
+    return build_page(from_path, template, dest_path, metadata, cache, profiler, assets)[0]
+
+
+def build_page(from_path, template, dest_path, metadata=None, cache=None, profiler=None, assets=None, collect=()):
+    # Returns (stats, facts); see collect_facts.
+    if not isinstance(template, Template):
+        template = Template.load(template)
+    if profiler is None:
+        profiler = NULL_PROFILER
+    logger.debug(" * %s %s -> %s", from_path, template.name, dest_path)
+
+    with profiler.stage("read", from_path):
+        with open(from_path, "r", encoding="utf-8") as from_file:
+            markdown_content = from_file.read()
+
+    context, stats, facts = render_context(
+        from_path, markdown_content, template, metadata, cache, assets, profiler, collect
+    )
+
+    # When the body is a node tree it is rendered while it is written.
+    with profiler.stage("write", from_path):
+        with OutputFile(dest_path) as to_file:
+            template.write(to_file, context)
+        changed = to_file.commit()
+
+    stats["written" if changed else "unchanged"] += 1
+    return stats, facts
+
+
+def discover_pages(dir_path_content, dest_dir_path, tree=None):
+    if tree is None:
+        if not os.path.isdir(dir_path_content):
+            raise FileNotFoundError(f"❌ Directory not found: {dir_path_content}")
+        tree = scan_tree(dir_path_content)
+
+    return [
+        (path, os.path.join(dest_dir_path, rel_path[: -len(".md")] + ".html"))
+        for rel_path, path in tree.paths(".md")
+    ]
+
+
+# What every page of a build shares, set once per worker by init_worker so that
+# tasks carry only their page's paths instead of re-pickling it all each time.
+_worker_state = {}
+
+
+def init_worker(template, cache=None, assets=None, collect=(), profile=False):
+    _worker_state.update(template=template, cache=cache, assets=assets, collect=collect, profile=profile)
+
+
+def generate_page_task(from_path, dest_path):
+    state = _worker_state
+    profiler = BuildProfiler() if state["profile"] else None
+    stats, facts = build_page(
+        from_path,
+        state["template"],
+        dest_path,
+        cache=state["cache"],
+        profiler=profiler,
+        assets=state["assets"],
+        collect=state["collect"],
+    )
+    return stats, profiler.records if profiler is not None else [], facts
+
 
+def render_page_task(from_path, markdown_content):
+    state = _worker_state
+    return render_page(
+        from_path,
+        markdown_content,
+        state["template"],
+        state["cache"],
+        state["assets"],
+        state["collect"],
+        state["profile"],
+    )
 
-def generate_page(from_path, template_path, dest_path):
-    print(f" * {from_path} {template_path} -> {dest_path}")
 
-    with open(from_path, "r", encoding="utf-8") as from_file:
-        markdown_content = from_file.read()
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    manifest=None,
+    jobs=1,
+    cache=None,
+    profiler=None,
+    assets=None,
+    graph=None,
+    changed=(),
+    pipelined=False,
+    queue_size=None,
+    index=None,
+    tree=None,
+):
+    if profiler is None:
+        profiler = NULL_PROFILER
+    stats = Counter()
+    with profiler.stage("discover"):
+        pages = discover_pages(dir_path_content, dest_dir_path, tree)
+    template = Template.load(template_path)
+    if assets is not None:
+        template = Template(assets.rewrite_html(template.source), name=template.name)
 
-    with open(template_path, "r", encoding="utf-8") as template_file:
-        template = template_file.read()
+    if manifest is not None:
+        # A parser or highlighter change alters the markup of every page, like a template change.
+        template_inputs = f"{PARSER_VERSION}\0{HIGHLIGHTER_VERSION}\0{template.source}"
+        if assets is not None:
+            if graph is None:
+                # Fingerprinted asset URLs end up in every page, so they count as a template input.
+                template_inputs += "\0" + assets.digest
+            else:
+                # The graph rebuilds the pages using a changed asset or image, but turning
+                # fingerprinting or image optimization on or off changes every page.
+                template_inputs += f"\0{bool(assets.assets)}\0{bool(assets.images)}"
+        template_hash = hash_bytes(template_inputs.encode("utf-8"))
+        stale_pages = []
+        fresh_pages = []
+        for from_path, dest_path in pages:
+            source_hash = hash_file(from_path)
+            if manifest.is_fresh(from_path, source_hash, template_hash, dest_path) and (
+                graph is None or from_path in graph.pages
+            ):
+                fresh_pages.append((from_path, dest_path, source_hash))
+                continue
+            stale_pages.append((from_path, dest_path, source_hash))
+        if graph is not None:
+            # Pages whose images or linked pages changed are rebuilt even though their own source didn't.
+            sources = {from_path for from_path, _ in pages}
+            added_or_removed = (sources ^ set(manifest.entries)) | (sources ^ set(graph.pages))
+            affected = graph.affected(changed, added_or_removed)
+            for page in fresh_pages:
+                if page[0] in affected:
+                    logger.debug("🔗 Dependency changed: %s", page[0])
+                    stale_pages.append(page)
+            stale_pages.sort()
+            fresh_pages = [page for page in fresh_pages if page[0] not in affected]
+        for from_path, dest_path, _ in fresh_pages:
+            logger.debug("⏭️  Unchanged: %s", from_path)
+            if index is not None and from_path not in index.pages:
+                index.record(from_path, page_url(dest_path, dest_dir_path))
+    else:
+        stale_pages = [(from_path, dest_path, None) for from_path, dest_path in pages]
+    if graph is not None:
+        graph.prune(from_path for from_path, _ in pages)
+    if index is not None:
+        index.prune(from_path for from_path, _ in pages)
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
+    collect = []
+    if graph is not None:
+        collect.append("links")
+    if index is not None:
+        collect.append("index")
+    collect = tuple(collect)
 
-    title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
+    def page_done(from_path, dest_path, source_hash, facts):
+        if manifest is not None:
+            manifest.record(from_path, source_hash, template_hash, dest_path)
+        if graph is not None:
+            graph.record_urls(from_path, dest_path, template_path, *facts["urls"])
+        if index is not None:
+            index.record_facts(from_path, facts["index"], page_url(dest_path, dest_dir_path))
 
-    dest_dir_path = os.path.dirname(dest_path)
-    if dest_dir_path != "":
-        os.makedirs(dest_dir_path, exist_ok=True)
+    if pipelined and stale_pages:
+        from pipeline import DEFAULT_QUEUE_SIZE, run_pipeline
 
-    with open(dest_path, "w", encoding="utf-8") as to_file:
-        to_file.write(template)
+        with profiler.stage("pipeline"):
+            page_stats, report = run_pipeline(
+                stale_pages,
+                template,
+                cache,
+                assets,
+                jobs,
+                queue_size or DEFAULT_QUEUE_SIZE,
+                on_done=page_done,
+                collect=collect,
+                profiler=profiler,
+            )
+        logger.info("🚰 Pipeline: %s", report.format())
+        return stats + page_stats
 
+    if jobs == 1 or len(stale_pages) <= 1:
+        for from_path, dest_path, source_hash in stale_pages:
+            logger.info("📄 Generating page from %s → %s", from_path, dest_path)
+            try:
+                page_stats, facts = build_page(
+                    from_path, template, dest_path, cache=cache, profiler=profiler, assets=assets, collect=collect
+                )
+            except Exception as e:
+                raise PageGenerationError(from_path, e) from e
+            stats += page_stats
+            page_done(from_path, dest_path, source_hash, facts)
+        return stats
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
-    
-    print(f"DEBUG: Checking directory: {dir_path_content}")
-    
-    if not os.path.exists(dir_path_content):
-        raise FileNotFoundError(f"❌ Directory not found: {dir_path_content}")
-    
-    for entry in os.listdir(dir_path_content):
-        content_entry_path = os.path.join(dir_path_content, entry)
-        dest_entry_path = os.path.join(dest_dir_path, entry)
+    executor = ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker, initargs=(template, cache, assets, collect, profiler.enabled)
+    )
+    try:
+        futures = [executor.submit(generate_page_task, from_path, dest_path) for from_path, dest_path, _ in stale_pages]
+        for future, (from_path, dest_path, source_hash) in zip(futures, stale_pages):
+            try:
+                page_stats, records, facts = future.result()
+            except Exception as e:
+                executor.shutdown(cancel_futures=True)
+                raise PageGenerationError(from_path, e) from e
+            logger.info("📄 Generated page from %s → %s", from_path, dest_path)
+            stats += page_stats
+            if records:
+                profiler.merge(records)
+            page_done(from_path, dest_path, source_hash, facts)
+    finally:
+        executor.shutdown()
+    return stats
 
-        if os.path.isdir(content_entry_path):
-            os.makedirs(dest_entry_path, exist_ok=True)
-            generate_pages_recursive(content_entry_path, template_path, dest_entry_path)
 
-        elif os.path.isfile(content_entry_path) and entry.endswith(".md"):
-            dest_html_path = os.path.join(dest_dir_path, entry.replace(".md", ".html"))
-            print(f"📄 Generating page from {content_entry_path} → {dest_html_path}")
-            generate_page(content_entry_path, template_path, dest_html_path)
+def remove_stale_pages(manifest, dest_dir_path=None):
+    for dest_path in manifest.prune():
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            logger.info("🗑️  Removed stale page: %s", dest_path)
+        if dest_dir_path is not None:
+            _remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
 
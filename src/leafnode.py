@@ -1,14 +1,23 @@
 from htmlnode import HTMLNode
 
-class LeafNode(HTMLNode):                                                                                                       
+class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         if value is None:
             raise ValueError("LeafNode must have a value.")
         super().__init__(tag=tag, value=value, children=None, props=props)
     
     def to_html(self):
-        if self.value is None:
+        html = self._html
+        if html is None:
             raise ValueError("LeafNode must have a value.")
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return html
+        return f"<{self.tag}{self._attrs}>{html}</{self.tag}>"
+
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_html(self, fp):
+        fp.write(self.to_html())
@@ -1,20 +1,301 @@
+import argparse
+import logging
 import os
-from initilizer import copy_static, generate_pages_recursive
+import shutil
+import sys
+from initilizer import LINK_MODES, sync_static, generate_pages_recursive, remove_stale_pages
+from manifest import BuildManifest
+from depgraph import DependencyGraph
+from siteindex import SiteIndex, write_site_outputs
+from assets import MANIFEST_NAME, AssetManifest, fingerprint_static
+from images import (
+    INDEX_NAME,
+    can_resize,
+    changed_images,
+    image_paths,
+    load_image_index,
+    optimize_images,
+    save_image_index,
+)
+from compress import available_formats, compress_tree
+from discovery import IGNORE_FILE, scan_tree
+from cache import DEFAULT_MAX_BYTES, HTMLCache
+from misc import PARSER_VERSION
+from highlight import HIGHLIGHTER_VERSION
+from pipeline import DEFAULT_QUEUE_SIZE
+from profiler import NULL_PROFILER, BuildProfiler
 
-def main():
+logger = logging.getLogger("main")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("build", "serve"),
+        default="build",
+        help="build the site, or build it and serve public/ (default: build)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only regenerate pages whose markdown or template changed since the last build",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="delete public/ before building instead of only replacing changed and stale outputs",
+    )
+    parser.add_argument(
+        "--static-link",
+        choices=LINK_MODES,
+        default="reflink",
+        help="how changed static files are placed in public/ (default: reflink, falling back to copy)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes for page generation (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="generate pages with an asyncio pipeline that overlaps reads, parsing (--jobs workers) and writes",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="pages buffered between pipeline stages (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="also write static files as name.<hash>.ext and point pages and the template at them",
+    )
+    parser.add_argument(
+        "--optimize-images",
+        action="store_true",
+        help="recompress PNG/JPEG static images, write responsive variants and add their sizes to <img> tags",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help=f"write precompressed sidecars ({', '.join('.' + fmt for fmt in available_formats())}) next to HTML/CSS/JS/SVG/XML/JSON outputs",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="absolute site URL, e.g. https://example.com; also writes sitemap.xml, atom.xml and a search index",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help=f".gitignore-style pattern for content and static files to leave out; "
+        f"also read from {IGNORE_FILE} in either directory (repeatable)",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port for serve (default: 8888)")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="with serve, rebuild changed pages and reload open browsers",
+    )
+    parser.add_argument("--cache-dir", default=".cache", help="directory for build caches (default: .cache)")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse markdown instead of using cached page bodies")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="size cap in MiB for cached page bodies, least recently used are evicted first (default: %(default)s)",
+    )
+    parser.add_argument("--dump-deps", action="store_true", help="print each page's recorded dependencies after the build")
+    parser.add_argument("--profile", action="store_true", help="record per-stage timings and print a report")
+    parser.add_argument("--profile-top", type=int, default=10, help="slowest pages to list with --profile (default: 10)")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace-event JSON file (implies --profile)")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="log every file that is processed")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+    args = parser.parse_args(argv)
+    if args.trace:
+        args.profile = True
+    if args.queue_size < 1:
+        parser.error("--queue-size must be a positive number")
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    if args.watch and args.fingerprint:
+        # The watcher copies an edited static file in place; its fingerprinted URL would keep the old content.
+        parser.error("--watch can't be combined with --fingerprint")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
     static_src = "static"
     public_dest = "public"
     content_src = "src/content"  # ✅ Update path to `src/content`
     template_src = "src/template.html"  # ✅ Ensure template is correctly referenced
 
-    print(f"Current Working Directory: {os.getcwd()}")
-    print("🧹 Cleaning public directory...")
-    copy_static(static_src, public_dest)
+    if args.verbose:
+        level = logging.DEBUG
+    elif args.quiet:
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+    logging.basicConfig(level=level, format="%(message)s", stream=sys.stdout)
+    profiler = BuildProfiler() if args.profile else NULL_PROFILER
+
+    logger.info("Current Working Directory: %s", os.getcwd())
+    manifest_path = os.path.join(args.cache_dir, "manifest.json")
+    graph = DependencyGraph.load(os.path.join(args.cache_dir, "deps.json"), content_src, static_src)
+    index = SiteIndex.load(os.path.join(args.cache_dir, "pages.json")) if args.base_url else None
+    # Both trees are scanned once and shared by every stage that reads them.
+    with profiler.stage("discover"):
+        static_tree = scan_tree(static_src, exclude=args.exclude)
+        content_tree = scan_tree(content_src, exclude=args.exclude)
+    logger.info("🔎 Found %d content and %d static file(s)", len(content_tree), len(static_tree))
+    manifest = BuildManifest.load(manifest_path)
+    if not args.incremental:
+        # Every page is regenerated; the loaded entries still tell which outputs went stale.
+        manifest.rebuild_all = True
+    if args.clean and os.path.exists(public_dest):
+        logger.info("🧹 Cleaning public directory...")
+        shutil.rmtree(public_dest)
+    logger.info("📦 Syncing static files...")
+    # The optimizer overwrites images at their original URL, unless fingerprinting moved them.
+    with profiler.stage("sync_static"):
+        report = sync_static(
+            static_src,
+            public_dest,
+            manifest.static_files,
+            link=args.static_link,
+            tree=static_tree,
+            owned=image_paths(static_tree) if args.optimize_images and not args.fingerprint else (),
+        )
+    manifest.static_files = report.files
+    static_changes = [os.path.join(static_src, rel_path) for rel_path in report.changed]
+    logger.info("📦 Static files: %d copied, %d skipped, %d removed", report.copied, report.skipped, report.removed)
+
+    assets = None
+    if args.fingerprint:
+        asset_manifest_path = os.path.join(public_dest, MANIFEST_NAME)
+        with profiler.stage("fingerprint"):
+            assets = fingerprint_static(
+                static_src, public_dest, previous=AssetManifest.load(asset_manifest_path), tree=static_tree
+            )
+        assets.save(asset_manifest_path)
+        logger.info("🔖 Fingerprinted %d static file(s)", len(assets.assets))
+
+    if args.optimize_images:
+        image_cache_dir = os.path.join(args.cache_dir, "images")
+        image_index_path = os.path.join(image_cache_dir, INDEX_NAME)
+        previous_images = load_image_index(image_index_path)
+        with profiler.stage("images"):
+            images, image_stats = optimize_images(
+                static_src,
+                public_dest,
+                image_cache_dir,
+                assets=assets,
+                previous=previous_images,
+                tree=static_tree,
+            )
+        save_image_index(image_index_path, images)
+        # Pages embedding an image whose size or variants changed need new markup, even if the source didn't change.
+        static_changes.extend(
+            os.path.join(static_src, *url.lstrip("/").split("/")) for url in changed_images(previous_images, images)
+        )
+        if assets is None:
+            assets = AssetManifest()
+        assets.images = images
+        logger.info(
+            "🖼️  Images: %d processed, %d files written, %d cached, %d stale removed",
+            image_stats["images"],
+            image_stats["written"],
+            image_stats["cache_hits"],
+            image_stats["removed"],
+        )
+        if not can_resize():
+            logger.info("🖼️  Pillow is not installed: images were recompressed, but no resized or WebP variants were made")
+
+    cache = None
+    if not args.no_cache:
+        cache = HTMLCache(
+            os.path.join(args.cache_dir, "html"), (PARSER_VERSION, HIGHLIGHTER_VERSION), args.cache_size * 1024 * 1024
+        )
+
+    logger.info("🚀 Generating site recursively...")
+    stats = generate_pages_recursive(
+        content_src,
+        template_src,
+        public_dest,
+        manifest,
+        jobs=args.jobs,
+        cache=cache,
+        profiler=profiler,
+        assets=assets,
+        graph=graph,
+        changed=static_changes,
+        pipelined=args.pipeline,
+        queue_size=args.queue_size,
+        index=index,
+        tree=content_tree,
+    )
+
+    logger.info("✍️  Pages: %d written, %d unchanged", stats["written"], stats["unchanged"])
+    if cache is not None:
+        cache.evict()
+        logger.info("🗃️  Body cache: %d hits, %d misses", stats["cache_hits"], stats["cache_misses"])
+    highlighted = stats["highlight_hits"] + stats["highlight_misses"]
+    if highlighted:
+        logger.info(
+            "🖍️  Highlight cache: %d hits, %d misses (%.0f%% hit rate)",
+            stats["highlight_hits"],
+            stats["highlight_misses"],
+            100 * stats["highlight_hits"] / highlighted,
+        )
+
+    remove_stale_pages(manifest, public_dest)
+    manifest.save()
+    graph.save()
+    if args.dump_deps:
+        print(graph.dump())
+
+    if index is not None:
+        with profiler.stage("site_outputs"):
+            write_site_outputs(public_dest, index, args.base_url)
+        index.save()
+
+    if args.compress:
+        with profiler.stage("compress"):
+            compressed = compress_tree(public_dest, jobs=args.jobs)
+        logger.info(
+            "🗜️  Compressed: %d written, %d up to date, %d not worth it, %d orphans removed",
+            compressed["written"],
+            compressed["fresh"],
+            compressed["not_worth_it"],
+            compressed["removed"],
+        )
+
+    logger.info("🎉 Static site generated successfully!")
+
+    if args.profile:
+        print(profiler.format_report(top=args.profile_top))
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+            logger.info("📈 Wrote trace to %s", args.trace)
 
-    print("🚀 Generating site recursively...")
-    generate_pages_recursive(content_src, template_src, public_dest)
+    if args.command == "serve":
+        from devserver import SiteWatcher, serve
 
-    print("🎉 Static site generated successfully!")
+        watcher = None
+        if args.watch:
+            watcher = SiteWatcher(
+                content_src, static_src, template_src, public_dest, cache=cache, exclude=args.exclude, assets=assets
+            )
+        serve(public_dest, port=args.port, watcher=watcher)
 
 if __name__ == "__main__":
     main()
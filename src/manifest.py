@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_versioned_json(path, version):
+    # Returns None when the file is missing, corrupt or written by another version.
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def save_versioned_json(path, version, data, indent=None):
+    # Written to a temporary file and renamed, so an interrupted build never leaves half a file.
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, **data}, f, indent=indent, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class BuildManifest:
+    def __init__(self, path, entries=None, static_files=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.static_files = static_files if static_files is not None else []
+        self.seen = set()
+        # Set for full builds: nothing is fresh, but outputs of deleted sources are still pruned.
+        self.rebuild_all = False
+
+    @classmethod
+    def load(cls, path):
+        data = load_versioned_json(path, MANIFEST_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("pages", {}), data.get("static", []))
+
+    def is_fresh(self, source_path, source_hash, template_hash, dest_path):
+        self.seen.add(source_path)
+        entry = self.entries.get(source_path)
+        if entry is None or self.rebuild_all:
+            return False
+        return (
+            entry["source_hash"] == source_hash
+            and entry["template_hash"] == template_hash
+            and entry["dest_path"] == dest_path
+            and os.path.exists(dest_path)
+        )
+
+    def record(self, source_path, source_hash, template_hash, dest_path):
+        self.entries[source_path] = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "dest_path": dest_path,
+        }
+
+    def prune(self):
+        removed = []
+        for source_path in list(self.entries):
+            if source_path not in self.seen:
+                removed.append(self.entries.pop(source_path)["dest_path"])
+        return removed
+
+    def save(self):
+        save_versioned_json(self.path, MANIFEST_VERSION, {"pages": self.entries, "static": self.static_files}, indent=2)
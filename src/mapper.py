@@ -21,6 +21,6 @@ def text_node_to_html_node(text_node):
         case TextType.IMAGE:
             if not text_node.url:
                 raise ValueError("TextType.IMAGE requires a URL.")
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text, "loading": "lazy"})
         case _:
             raise ValueError(f"Unsupported TextType: {text_node.text_type}")
\ No newline at end of file
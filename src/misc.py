@@ -2,8 +2,50 @@ from textnode import TextNode, TextType
 from leafnode import LeafNode
 from parentnode import ParentNode
 from mapper import *
+from highlight import highlight_code
+import logging
 import re
 
+# Bump whenever markdown_to_html_node can produce different HTML for the
+# same input, so cached page bodies are invalidated.
+PARSER_VERSION = 6
+
+logger = logging.getLogger(__name__)
+
+IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_LINK_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+DELIMITER_RE = re.compile(r"`|\*\*|\*|_")
+
+DELIMITER_TYPES = {
+    "`": TextType.CODE,
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+}
+
+# A delimited span must close before any delimiter that the multi-pass
+# pipeline splits on earlier (code, then bold, then *, then _).
+CLOSING_RES = {
+    "**": re.compile(r"`|\*\*"),
+    "*": re.compile(r"`|\*\*|\*"),
+    "_": DELIMITER_RE,
+}
+
+NON_SPACE_RE = re.compile(r"\S")
+BLANK_LINES_RE = re.compile(r"\n(?:[^\S\n]*\n)+|\n[^\S\n]*\Z")
+FENCE_LINE_RE = re.compile(r"^[^\S\n]*```", re.MULTILINE)
+HEADING_RE = re.compile(r"(#{1,6}) (.+)")
+HEADING_PREFIX_RE = re.compile(r"#{1,6} ")
+QUOTE_BLOCK_RE = re.compile(r">[^\n]*(?:\n>[^\n]*)*")
+LIST_ITEM_RE = re.compile(r"([ \t]*)(?:([*-])|(\d+)\.)[ \t]+(.*)")
+TABLE_DELIMITER_RE = re.compile(r"[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*")
+TABLE_PIPE_RE = re.compile(r"(?<!\\)\|")
+# Deeper items are kept at the deepest level, which bounds the recursion
+# depth of to_html (markdown-it uses the same limit).
+MAX_LIST_DEPTH = 100
+
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -26,14 +68,10 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matchs = re.findall(pattern, text)
-    return matchs
+    return IMAGE_RE.findall(text)
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text) 
-    return matches
+    return LINK_RE.findall(text)
 
 def split_nodes_image(old_nodes):
 
@@ -92,6 +130,48 @@ def split_nodes_link(old_nodes):
 
 
 def text_to_textnodes(text):
+    nodes = []
+    position = 0
+    for match in INLINE_LINK_RE.finditer(text):
+        scan_delimiters(text, position, match.start(), nodes)
+        alt, image_url, anchor, link_url = match.groups()
+        if image_url is not None:
+            nodes.append(TextNode(alt, TextType.IMAGE, image_url))
+        else:
+            nodes.append(TextNode(anchor, TextType.LINK, link_url))
+        position = match.end()
+    scan_delimiters(text, position, len(text), nodes)
+    return nodes
+
+
+def scan_delimiters(text, start, end, nodes):
+    position = text_start = start
+    while True:
+        match = DELIMITER_RE.search(text, position, end)
+        if match is None:
+            break
+        delimiter = match.group()
+        if match.start() > text_start:
+            nodes.append(TextNode(text[text_start:match.start()], TextType.TEXT))
+
+        content_start = match.end()
+        if delimiter == "`":
+            close = text.find("`", content_start, end)
+        else:
+            closing = CLOSING_RES[delimiter].search(text, content_start, end)
+            close = closing.start() if closing is not None and closing.group() == delimiter else -1
+        if close == -1:
+            raise ValueError("Invalid markdown, formatted section not closed")
+
+        if close > content_start:
+            nodes.append(TextNode(text[content_start:close], DELIMITER_TYPES[delimiter]))
+        position = text_start = close + len(delimiter)
+
+    if end > text_start:
+        nodes.append(TextNode(text[text_start:end], TextType.TEXT))
+
+
+def text_to_textnodes_multipass(text):
 
     nodes = [TextNode(text, TextType.TEXT)]
 
@@ -109,65 +189,154 @@ def text_to_textnodes(text):
     return nodes
 
 def markdown_to_blocks(markdown):
+    return [markdown[start:end] for start, end in iter_block_spans(markdown)]
+
+
+def iter_block_spans(markdown):
+    # Yields (start, end) offsets of each block, trimmed of surrounding
+    # whitespace. Blank lines separate blocks, except inside a block that
+    # opens with a ``` fence that has not been closed yet.
+    fence_start = None
+    position = 0
+    length = len(markdown)
+
+    while position < length:
+        gap = BLANK_LINES_RE.search(markdown, position)
+        segment_end = gap.start() if gap else length
+        next_position = gap.end() if gap else length
+
+        content = NON_SPACE_RE.search(markdown, position, segment_end)
+        if content is not None:
+            start = content.start()
+            end = segment_end
+            while markdown[end - 1].isspace():
+                end -= 1
+
+            if fence_start is not None:
+                if FENCE_LINE_RE.search(markdown, position, end):
+                    yield fence_start, end
+                    fence_start = None
+                else:
+                    fence_end = end
+            elif markdown.startswith("```", start):
+                first_line_end = markdown.find("\n", start, end)
+                if first_line_end == -1:
+                    first_line_end = end
+                if markdown.find("```", start + 3, first_line_end) != -1:
+                    yield start, end
+                elif FENCE_LINE_RE.search(markdown, first_line_end, end):
+                    yield start, end
+                else:
+                    fence_start, fence_end = start, end
+            else:
+                yield start, end
 
-    blocks = [block.strip() for block in markdown.split("\n\n")]
-
-    return [block for block in blocks if block]
-
-def block_to_block_type(block):
+        position = next_position
 
-    lines = block.split("\n")
+    if fence_start is not None:
+        yield fence_start, fence_end
 
-    if re.match(r"^#{1,6} ", lines[0]):
-        return "heading"
 
-    if lines[0].startswith("```") and lines[-1].startswith("```"):
-        return "code"
+def block_to_block_type(block):
 
-    if all(line.startswith(">") for line in lines):
-        return "quote"
+    first = block[:1]
+
+    if first == "#":
+        if HEADING_PREFIX_RE.match(block):
+            return "heading"
+    elif first == "`":
+        if block.startswith("```") and block.startswith("```", block.rfind("\n") + 1):
+            return "code"
+    elif first == ">":
+        if QUOTE_BLOCK_RE.fullmatch(block):
+            return "quote"
+    elif first == "*" or first == "-" or first.isdigit():
+        list_type = list_block_type(block)
+        if list_type is not None:
+            return list_type
+
+    newline = block.find("\n")
+    if newline != -1 and "|" in block[:newline] and is_table(block, newline):
+        return "table"
 
-    if all(re.match(r"^(\*|-)\s", line) for line in lines):
-        return "unordered_list"
+    return "paragraph"
 
-    if all(re.match(r"^\d+\.\s", line) for line in lines):
-        numbers = [int(line.split(".")[0]) for line in lines]
-        if numbers == list(range(1, len(numbers) + 1)):
-            return "ordered_list"
 
-    return "paragraph"
+def list_block_type(block):
+    # Every line has to be an item; indented lines are nested items and
+    # may use either kind of marker, while top-level items keep the kind of
+    # the first one and ordered ones count up from 1.
+    ordered = None
+    expected = 1
+    for line in block.split("\n"):
+        match = LIST_ITEM_RE.match(line)
+        if not match:
+            return None
+        if match.group(1):
+            continue
+        if ordered is None:
+            ordered = match.group(2) is None
+        elif ordered != (match.group(2) is None):
+            return None
+        if ordered:
+            if int(match.group(3)) != expected:
+                return None
+            expected += 1
+    return "ordered_list" if ordered else "unordered_list"
+
+
+def is_table(block, newline):
+    delimiter_end = block.find("\n", newline + 1)
+    if delimiter_end == -1:
+        delimiter_end = len(block)
+    delimiter = block[newline + 1 : delimiter_end]
+    if "|" not in delimiter or not TABLE_DELIMITER_RE.fullmatch(delimiter):
+        return False
+    return len(split_table_row(delimiter)) == len(split_table_row(block[:newline]))
+
+
+def split_table_row(row):
+    row = row.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|") and not row.endswith("\\|"):
+        row = row[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in TABLE_PIPE_RE.split(row)]
 
 
 def markdown_to_html_node(markdown):
+    return parse_markdown(markdown)[0]
 
-    blocks = markdown_to_blocks(markdown)
+
+def parse_markdown(markdown):
+    # Returns the body node and the text of the first "# " heading, found in
+    # the same pass over the blocks (None when there is no such heading).
     block_nodes = []
+    title = None
 
-    for block in blocks:
+    for start, end in iter_block_spans(markdown):
+        block = markdown[start:end]
         block_type = block_to_block_type(block)
-
-        if block_type == "heading":
-            node = handle_heading(block)
-        elif block_type == "paragraph":
-            node = handle_paragraph(block)
-        elif block_type == "code":
-            node = handle_code_block(block)
-        elif block_type == "quote":
-            node = handle_quote_block(block)
-        elif block_type == "unordered_list":
-            node = handle_unordered_list(block)
-        elif block_type == "ordered_list":
-            node = handle_ordered_list(block)
-        else:
+        handler = BLOCK_HANDLERS.get(block_type)
+        if handler is None:
             raise ValueError(f"Unknown block type: {block_type}")
+        if title is None:
+            title = heading_title(block, block_type)
+        block_nodes.append(handler(block))
+
+    return ParentNode("div", block_nodes), title
 
-        block_nodes.append(node)
 
-    return ParentNode("div", block_nodes)    
+def heading_title(block, block_type):
+    # A page's title is its first block that is a "# " heading.
+    if block_type != "heading" or not block.startswith("# "):
+        return None
+    line_end = block.find("\n")
+    return block[2 : line_end if line_end != -1 else len(block)].strip()
 
 def handle_heading(block):
 
-    match = re.match(r"^(#{1,6}) (.+)", block)
+    match = HEADING_RE.match(block)
     if not match:
         raise ValueError(f"Invalid heading format: {block}")
     
@@ -183,52 +352,112 @@ def handle_paragraph(block):
     return ParentNode("p", children)
 
 def handle_code_block(block):
-    text_content = block.strip("`").strip()
-    return ParentNode("pre", [ParentNode("code", [LeafNode(None, text_content)])])
+    first_line_end = block.find("\n")
+    if first_line_end == -1:
+        return ParentNode("pre", [ParentNode("code", [LeafNode(None, block.strip("`").strip())])])
+
+    # The info string after the opening fence names the language; only its first word counts.
+    info = block[3:first_line_end].strip().split(None, 1)
+    text_content = block[first_line_end + 1 : max(block.rfind("\n"), first_line_end + 1)]
+    if not info:
+        return ParentNode("pre", [ParentNode("code", [LeafNode(None, text_content)])])
+    children = highlight_code(text_content, info[0]) if text_content else None
+    if children is None:
+        children = [LeafNode(None, text_content)]
+    return ParentNode("pre", [ParentNode("code", children, {"class": f"language-{info[0]}"})])
 
 def handle_quote_block(block):
     quote_text = "\n".join(line.lstrip("> ") for line in block.split("\n"))
     children = text_to_children(quote_text)
     return ParentNode("blockquote", children)
 
-def handle_unordered_list(block):
-    list_items = []
+def handle_list(block):
+    # One pass over the lines with a stack of open lists: each line pushes
+    # or pops at most the levels it opens or closes, so the work stays
+    # linear however deep the nesting goes. A level is
+    # [indent, content column of its last item, tag, props, items], and
+    # each item is the children of its <li>.
+    stack = []
     for line in block.split("\n"):
-        match = re.match(r"^(\*|-)\s*(.*)", line)
-        if not match:
-            continue
+        match = LIST_ITEM_RE.match(line)
+        indent = len(match.group(1).expandtabs(4))
+        while len(stack) > 1 and indent < stack[-1][0]:
+            close_list_level(stack)
+        if not stack or (indent >= stack[-1][1] and len(stack) < MAX_LIST_DEPTH):
+            number = match.group(3)
+            if number is None:
+                stack.append([indent, 0, "ul", None, []])
+            else:
+                stack.append([indent, 0, "ol", None if int(number) == 1 else {"start": number}, []])
+        level = stack[-1]
+        level[1] = match.start(4)
+        level[4].append(text_to_children(match.group(4)))
+
+    while len(stack) > 1:
+        close_list_level(stack)
+    return list_level_node(stack[0])
 
-        text = match.group(2)
-        print(f"DEBUG: List item text (processed): {text}")
 
-        children = text_to_children(text)
-        list_items.append(ParentNode("li", children))
+def close_list_level(stack):
+    node = list_level_node(stack.pop())
+    stack[-1][4][-1].append(node)
 
-    return ParentNode("ul", list_items)
 
+def list_level_node(level):
+    _, _, tag, props, items = level
+    return ParentNode(tag, [ParentNode("li", children) if children else LeafNode("li", "") for children in items], props)
 
-def handle_ordered_list(block):
-    list_items = [ParentNode("li", text_to_children(line.split(". ", 1)[1])) for line in block.split("\n")]
-    return ParentNode("ol", list_items)
 
 def handle_table(block):
     rows = block.split("\n")
-    header_cells = [ParentNode("th", text_to_children(cell.strip())) for cell in rows[0].split("|") if cell]
-    header_row = ParentNode("tr", header_cells)
+    header = split_table_row(rows[0])
+    alignments = []
+    for cell in split_table_row(rows[1]):
+        if cell.startswith(":"):
+            alignments.append({"align": "center"} if cell.endswith(":") else {"align": "left"})
+        else:
+            alignments.append({"align": "right"} if cell.endswith(":") else None)
 
+    header_row = ParentNode("tr", [table_cell("th", cell, align) for cell, align in zip(header, alignments)])
+    table = [ParentNode("thead", [header_row])]
     body_rows = []
-    for row in rows[2:]: 
-        body_cells = [ParentNode("td", text_to_children(cell.strip())) for cell in row.split("|") if cell]
-        body_rows.append(ParentNode("tr", body_cells))
-
-    return ParentNode("table", [ParentNode("thead", [header_row]), ParentNode("tbody", body_rows)])
+    for row in rows[2:]:
+        cells = split_table_row(row)
+        # Rows are cut or padded to the header's width.
+        cells = cells[: len(header)] + [""] * (len(header) - len(cells))
+        body_rows.append(ParentNode("tr", [table_cell("td", cell, align) for cell, align in zip(cells, alignments)]))
+    if body_rows:
+        table.append(ParentNode("tbody", body_rows))
+    return ParentNode("table", table)
+
+
+def table_cell(tag, text, align):
+    children = text_to_children(text)
+    if not children:
+        return LeafNode(tag, "", align)
+    return ParentNode(tag, children, align)
+
+BLOCK_HANDLERS = {
+    "heading": handle_heading,
+    "paragraph": handle_paragraph,
+    "code": handle_code_block,
+    "quote": handle_quote_block,
+    "unordered_list": handle_list,
+    "ordered_list": handle_list,
+    "table": handle_table,
+}
 
 def text_to_children(text):
     text_nodes = text_to_textnodes(text)
     return [text_node_to_html_node(node) for node in text_nodes]
 
 def extract_title(markdown):
-    for line in markdown.split("\n"):
-        if line.startswith("# "):  
-            return line[2:].strip() 
-    raise ValueError("No H1 heading found in markdown")
\ No newline at end of file
+    # Same rule as parse_markdown, so a "# " line inside a code fence or a
+    # paragraph is never the title.
+    for start, end in iter_block_spans(markdown):
+        if markdown.startswith("# ", start):
+            block = markdown[start:end]
+            title = heading_title(block, block_to_block_type(block))
+            if title is not None:
+                return title
+    raise ValueError("No H1 heading found in markdown")
@@ -1,6 +1,8 @@
 from htmlnode import HTMLNode
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if tag is None or children is None:
             raise ValueError("ParentNode must have a tag.")
@@ -13,6 +15,25 @@ class ParentNode(HTMLNode):
             raise ValueError("ParentNode must have a tag.")
         if self.children is None:
             raise ValueError("ParentNode must have a children.")
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        children_html = "".join([child.to_html() for child in self.children])
+        return f"<{self.tag}{self._attrs}>{children_html}</{self.tag}>"
+
+    def iter_html(self):
+        if self.tag is None:
+            raise ValueError("ParentNode must have a tag.")
+        if self.children is None:
+            raise ValueError("ParentNode must have a children.")
+        yield f"<{self.tag}{self._attrs}>"
+        for child in self.children:
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
 
+    def write_html(self, fp):
+        if self.tag is None:
+            raise ValueError("ParentNode must have a tag.")
+        if self.children is None:
+            raise ValueError("ParentNode must have a children.")
+        fp.write(f"<{self.tag}{self._attrs}>")
+        for child in self.children:
+            child.write_html(fp)
+        fp.write(f"</{self.tag}>")
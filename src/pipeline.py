@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from initilizer import PageGenerationError, init_worker, render_page_task, write_output
+from profiler import NULL_PROFILER
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 32
+IO_WORKERS = 4
+
+
+class QueueStats:
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.samples = 0
+        self.total = 0
+        self.peak = 0
+
+    def sample(self, depth):
+        self.samples += 1
+        self.total += depth
+        self.peak = max(self.peak, depth)
+
+    @property
+    def mean(self):
+        return self.total / self.samples if self.samples else 0.0
+
+
+class PipelineReport:
+    def __init__(self, queue_size):
+        self.pages = 0
+        self.elapsed = 0.0
+        self.read_queue = QueueStats("read → parse", queue_size)
+        self.write_queue = QueueStats("parse → write", queue_size)
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def format(self):
+        lines = [f"{self.pages} page(s) in {self.elapsed:.2f}s ({self.pages_per_second:.1f} pages/s)"]
+        for queue in (self.read_queue, self.write_queue):
+            lines.append(f"  {queue.name}: peak {queue.peak}/{queue.maxsize}, mean {queue.mean:.1f}")
+        return "\n".join(lines)
+
+
+def read_page(path, profiler=NULL_PROFILER):
+    with profiler.stage("read", path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+def write_page(page, html, facts, profiler, on_done):
+    # Runs on an I/O thread: on_done records into the manifest, graph and index, which shouldn't stall the loop.
+    with profiler.stage("write", page[0]):
+        changed = write_output(page[1], html)
+    on_done(*page, facts)
+    return changed
+
+
+async def _run(pages, cpu_executor, cpu_workers, io_executor, report, on_done, profiler):
+    loop = asyncio.get_running_loop()
+    # Bounded queues: a full queue blocks the stage feeding it, so at most
+    # queue_size pages wait in each hand-off no matter how far ahead reads get.
+    read_queue = asyncio.Queue(report.read_queue.maxsize)
+    write_queue = asyncio.Queue(report.write_queue.maxsize)
+    stats = Counter()
+    pending = iter(pages)
+    remaining = {"readers": IO_WORKERS, "parsers": cpu_workers}
+
+    async def reader():
+        for page in pending:
+            markdown = await loop.run_in_executor(io_executor, read_page, page[0], profiler)
+            await read_queue.put((page, markdown))
+            report.read_queue.sample(read_queue.qsize())
+        remaining["readers"] -= 1
+        if remaining["readers"] == 0:
+            for _ in range(cpu_workers):
+                await read_queue.put(None)
+
+    async def parser():
+        while (item := await read_queue.get()) is not None:
+            page, markdown = item
+            try:
+                html, page_stats, facts, records = await loop.run_in_executor(
+                    cpu_executor, render_page_task, page[0], markdown
+                )
+            except Exception as e:
+                raise PageGenerationError(page[0], e) from e
+            stats.update(page_stats)
+            if records:
+                profiler.merge(records)
+            await write_queue.put((page, html, facts))
+            report.write_queue.sample(write_queue.qsize())
+        remaining["parsers"] -= 1
+        if remaining["parsers"] == 0:
+            for _ in range(IO_WORKERS):
+                await write_queue.put(None)
+
+    async def writer():
+        while (item := await write_queue.get()) is not None:
+            page, html, facts = item
+            changed = await loop.run_in_executor(io_executor, write_page, page, html, facts, profiler, on_done)
+            stats["written" if changed else "unchanged"] += 1
+            report.pages += 1
+            logger.info("📄 Generated page from %s → %s", page[0], page[1])
+
+    stages = [reader] * IO_WORKERS + [parser] * cpu_workers + [writer] * IO_WORKERS
+    tasks = [asyncio.ensure_future(stage()) for stage in stages]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # A failed page stops the other stages instead of leaving them blocked on a queue.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return stats
+
+
+def run_pipeline(
+    pages,
+    template,
+    cache=None,
+    assets=None,
+    jobs=1,
+    queue_size=DEFAULT_QUEUE_SIZE,
+    on_done=None,
+    collect=(),
+    profiler=None,
+):
+    report = PipelineReport(queue_size)
+    if profiler is None:
+        profiler = NULL_PROFILER
+    if on_done is None:
+        on_done = lambda *page_and_facts: None
+    else:
+        # Writers call it from several I/O threads; one page is recorded at a time.
+        lock = threading.Lock()
+        callback = on_done
+
+        def on_done(*page_and_facts):
+            with lock:
+                callback(*page_and_facts)
+
+    # Parsing holds the GIL, so more than one CPU worker only helps as separate processes.
+    # Either way the shared inputs are handed over once, not with every page.
+    worker_args = (template, cache, assets, collect, profiler.enabled)
+    if jobs > 1:
+        cpu_executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=worker_args)
+    else:
+        cpu_executor = ThreadPoolExecutor(max_workers=1, initializer=init_worker, initargs=worker_args)
+    io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS)
+    start = time.perf_counter()
+    try:
+        stats = asyncio.run(_run(pages, cpu_executor, jobs, io_executor, report, on_done, profiler))
+    finally:
+        report.elapsed = time.perf_counter() - start
+        cpu_executor.shutdown(cancel_futures=True)
+        io_executor.shutdown()
+    return stats, report
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+class NullProfiler:
+    enabled = False
+
+    def stage(self, name, page=None):
+        return nullcontext()
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class BuildProfiler:
+    enabled = True
+
+    def __init__(self):
+        # Each record is (stage, page, start_ns, duration_ns, pid, tid).
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, page=None):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self.records.append((name, page, start, duration, os.getpid(), threading.get_ident()))
+
+    def merge(self, records):
+        self.records.extend(records)
+
+    def stage_summary(self):
+        summary = defaultdict(lambda: [0, 0])
+        for name, _, _, duration, _, _ in self.records:
+            summary[name][0] += 1
+            summary[name][1] += duration
+        return {name: tuple(values) for name, values in summary.items()}
+
+    def page_totals(self):
+        totals = defaultdict(int)
+        for _, page, _, duration, _, _ in self.records:
+            if page is not None:
+                totals[page] += duration
+        return totals
+
+    def slowest_pages(self, count):
+        totals = self.page_totals()
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def format_report(self, top=10):
+        lines = []
+        summary = self.stage_summary()
+        total = sum(duration for _, duration in summary.values()) or 1
+
+        lines.append(f"{'stage':<14} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'share':>6}")
+        for name, (calls, duration) in sorted(summary.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(
+                f"{name:<14} {calls:>7} {duration / 1e6:>10.2f} {duration / calls / 1e6:>9.3f} "
+                f"{duration / total:>6.1%}"
+            )
+
+        slowest = self.slowest_pages(top)
+        if slowest:
+            lines.append("")
+            lines.append(f"slowest {len(slowest)} page(s):")
+            for page, duration in slowest:
+                lines.append(f"{duration / 1e6:>10.2f} ms  {page}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path):
+        if self.records:
+            origin = min(record[2] for record in self.records)
+        else:
+            origin = 0
+        events = []
+        for name, page, start, duration, pid, tid in self.records:
+            event = {
+                "name": name,
+                "cat": "build",
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            if page is not None:
+                event["args"] = {"page": page}
+            events.append(event)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+from misc import (
+    IMAGE_RE,
+    LINK_RE,
+    block_to_block_type,
+    markdown_to_blocks,
+    text_to_textnodes,
+)
+from textnode import TextType
+from frontmatter import Page, parse_date
+from manifest import load_versioned_json, save_versioned_json
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+SUMMARY_LENGTH = 200
+FEED_ENTRIES = 20
+SEARCH_DIR = "search"
+# Terms are bucketed by their first characters; a client loads only the buckets its query needs.
+SHARD_PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+
+WORD_RE = re.compile(r"[^\W_]+")
+WHITESPACE_RE = re.compile(r"\s+")
+PLAIN_SKIPPED_TYPES = (TextType.LINK, TextType.IMAGE)
+
+
+def page_url(dest_path, dest_dir_path):
+    rel_path = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[: -len("index.html")]
+    return "/" + rel_path
+
+
+def summarize(markdown):
+    for block in markdown_to_blocks(markdown):
+        if block_to_block_type(block) != "paragraph":
+            continue
+        try:
+            nodes = text_to_textnodes(block)
+        except ValueError:
+            continue
+        # Paragraphs made only of links and images are navigation, not prose.
+        if not any(node.text_type not in PLAIN_SKIPPED_TYPES and node.text.strip() for node in nodes):
+            continue
+        text = "".join(node.text for node in nodes if node.text_type != TextType.IMAGE)
+        text = WHITESPACE_RE.sub(" ", text).strip()
+        if len(text) <= SUMMARY_LENGTH:
+            return text
+        cut = text.rfind(" ", 0, SUMMARY_LENGTH)
+        return text[: cut if cut > 0 else SUMMARY_LENGTH] + "…"
+    return ""
+
+
+def search_terms(markdown):
+    # Link targets and images aren't prose; link text is kept.
+    text = IMAGE_RE.sub(" ", markdown)
+    text = LINK_RE.sub(lambda match: match.group(1), text)
+    return sorted({word for word in WORD_RE.findall(text.lower()) if len(word) >= MIN_TERM_LENGTH})
+
+
+def page_facts(front_matter, body, title):
+    # What the index needs from a page; the build collects it while rendering the page.
+    date = parse_date(front_matter.get("date"))
+    if date is not None and date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return {
+        "title": title,
+        "date": date.timestamp() if date is not None else None,
+        "summary": str(front_matter.get("summary") or summarize(body)),
+        "terms": search_terms(body),
+    }
+
+
+def index_entry(source_path, facts, url):
+    # A declared date orders the feed better than the file's mtime, which a checkout resets.
+    mtime = facts["date"]
+    if mtime is None:
+        mtime = os.stat(source_path).st_mtime
+    return {"url": url, "title": facts["title"], "mtime": mtime, "summary": facts["summary"], "terms": facts["terms"]}
+
+
+def page_metadata(source_path, url, markdown=None):
+    # Title and date come from a header-only read; the body is loaded for the summary and search terms.
+    page = Page(source_path, markdown)
+    return index_entry(source_path, page_facts(page.metadata, page.body, page.title), url)
+
+
+def iso_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SiteIndex:
+    def __init__(self, path, pages=None):
+        self.path = path
+        # Maps a page's markdown source to what the sitemap, feed and search index need from it.
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        data = load_versioned_json(path, INDEX_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+    def save(self):
+        save_versioned_json(self.path, INDEX_VERSION, {"pages": self.pages})
+
+    def record(self, source_path, url, markdown=None):
+        self.pages[source_path] = page_metadata(source_path, url, markdown)
+
+    def record_facts(self, source_path, facts, url):
+        self.pages[source_path] = index_entry(source_path, facts, url)
+
+    def prune(self, sources):
+        sources = set(sources)
+        for source in [source for source in self.pages if source not in sources]:
+            del self.pages[source]
+
+    def sorted_pages(self):
+        return sorted(self.pages.values(), key=lambda page: page["url"])
+
+
+def absolute_url(base_url, url):
+    return base_url.rstrip("/") + url
+
+
+def write_sitemap(path, pages, base_url):
+    # Imported here: initilizer imports this module. OutputFile leaves an unchanged file
+    # alone, so a no-op build doesn't touch its mtime or get it recompressed.
+    from initilizer import OutputFile
+
+    with OutputFile(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for page in pages:
+            f.write(
+                f"  <url><loc>{escape(absolute_url(base_url, page['url']))}</loc>"
+                f"<lastmod>{iso_time(page['mtime'])}</lastmod></url>\n"
+            )
+        f.write("</urlset>\n")
+    return f.commit()
+
+
+def write_atom_feed(path, pages, base_url, title, limit=FEED_ENTRIES):
+    from initilizer import OutputFile
+
+    entries = sorted(pages, key=lambda page: (-page["mtime"], page["url"]))[:limit]
+    updated = iso_time(entries[0]["mtime"]) if entries else iso_time(0)
+    site_url = absolute_url(base_url, "/")
+    with OutputFile(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write(f"  <title>{escape(title)}</title>\n")
+        f.write(f"  <id>{escape(site_url)}</id>\n")
+        f.write(f'  <link href="{escape(site_url)}"/>\n')
+        f.write(f'  <link rel="self" href="{escape(absolute_url(base_url, "/" + os.path.basename(path)))}"/>\n')
+        f.write(f"  <updated>{updated}</updated>\n")
+        for page in entries:
+            url = escape(absolute_url(base_url, page["url"]))
+            f.write("  <entry>\n")
+            f.write(f"    <title>{escape(page['title'])}</title>\n")
+            f.write(f'    <link href="{url}"/>\n')
+            f.write(f"    <id>{url}</id>\n")
+            f.write(f"    <updated>{iso_time(page['mtime'])}</updated>\n")
+            if page["summary"]:
+                f.write(f"    <summary>{escape(page['summary'])}</summary>\n")
+            f.write("  </entry>\n")
+        f.write("</feed>\n")
+    return f.commit()
+
+
+def write_search_index(dir_path, pages):
+    from initilizer import write_output
+
+    os.makedirs(dir_path, exist_ok=True)
+    shards = {}
+    documents = []
+    for doc_id, page in enumerate(pages):
+        documents.append({"url": page["url"], "title": page["title"], "summary": page["summary"]})
+        for term in page["terms"]:
+            shards.setdefault(term[:SHARD_PREFIX_LENGTH], {}).setdefault(term, []).append(doc_id)
+
+    for prefix, terms in shards.items():
+        # Each shard carries the documents its terms point to, numbered within the shard,
+        # so a query fetches only index.json and its own shards whatever the size of the site.
+        doc_ids = sorted({doc_id for ids in terms.values() for doc_id in ids})
+        local_ids = {doc_id: local_id for local_id, doc_id in enumerate(doc_ids)}
+        shard = {
+            "documents": [documents[doc_id] for doc_id in doc_ids],
+            "terms": {term: [local_ids[doc_id] for doc_id in ids] for term, ids in terms.items()},
+        }
+        write_output(
+            os.path.join(dir_path, f"{prefix}.json"),
+            json.dumps(shard, ensure_ascii=False, separators=(",", ":"), sort_keys=True),
+        )
+    write_output(
+        os.path.join(dir_path, "index.json"),
+        json.dumps(
+            {"prefix_length": SHARD_PREFIX_LENGTH, "shards": sorted(shards)}, ensure_ascii=False, separators=(",", ":")
+        ),
+    )
+
+    # Buckets whose terms all went away would otherwise linger from earlier builds.
+    for name in os.listdir(dir_path):
+        if name.endswith(".json") and name != "index.json" and name[: -len(".json")] not in shards:
+            os.remove(os.path.join(dir_path, name))
+    return len(shards)
+
+
+def write_site_outputs(public_dir, index, base_url, site_title=None):
+    pages = index.sorted_pages()
+    if site_title is None:
+        home = next((page for page in pages if page["url"] == "/"), None)
+        site_title = home["title"] if home is not None else "Site"
+    write_sitemap(os.path.join(public_dir, "sitemap.xml"), pages, base_url)
+    write_atom_feed(os.path.join(public_dir, "atom.xml"), pages, base_url, site_title)
+    shards = write_search_index(os.path.join(public_dir, SEARCH_DIR), pages)
+    logger.info("🗺️  Wrote sitemap.xml, atom.xml and %d search shard(s) for %d page(s)", shards, len(pages))
@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+import unittest
+from initilizer import generate_pages_recursive
+from manifest import BuildManifest
+
+
+class SiteTestCase(unittest.TestCase):
+    # A throwaway site in a temporary directory: content/, static/, public/,
+    # cache/ and template.html, with helpers to write sources and build it.
+    TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.cache = os.path.join(self.root, "cache")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.cache, "manifest.json")
+        os.makedirs(self.content)
+        os.makedirs(self.static)
+        self.write(self.template, self.TEMPLATE)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def read(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def build(self, **kwargs):
+        # An incremental build against the saved manifest; its stats are kept on self.stats.
+        manifest = BuildManifest.load(self.manifest_path)
+        self.stats = generate_pages_recursive(self.content, self.template, self.public, manifest, **kwargs)
+        manifest.save()
+        return manifest
@@ -0,0 +1,62 @@
+import re
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class Template:
+    def __init__(self, source, name="<template>"):
+        self.source = source
+        self.name = name
+        # chunks[i] is the literal text before slots[i]; the last chunk
+        # follows the final slot.
+        self.chunks = []
+        self.slots = []
+
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            self.chunks.append(source[position:match.start()])
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.chunks.append(source[position:])
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as template_file:
+            return cls(template_file.read(), name=path)
+
+    @property
+    def placeholders(self):
+        return set(self.slots)
+
+    def check_context(self, context):
+        missing = [name for name in self.slots if name not in context]
+        if missing:
+            raise ValueError(
+                f"Unknown placeholder(s) {', '.join(sorted(set(missing)))} in {self.name}; "
+                f"page provides: {', '.join(sorted(context)) or 'nothing'}"
+            )
+
+    def render(self, context):
+        self.check_context(context)
+
+        parts = [self.chunks[0]]
+        for name, literal in zip(self.slots, self.chunks[1:]):
+            value = context[name]
+            parts.append(value.to_html() if hasattr(value, "to_html") else str(value))
+            parts.append(literal)
+        return "".join(parts)
+
+    def write(self, fp, context):
+        self.check_context(context)
+
+        fp.write(self.chunks[0])
+        for name, literal in zip(self.slots, self.chunks[1:]):
+            value = context[name]
+            if hasattr(value, "write_html"):
+                value.write_html(fp)
+            else:
+                fp.write(str(value))
+            fp.write(literal)
+
+    def __repr__(self):
+        return f"Template(name={self.name}, slots={self.slots})"
@@ -0,0 +1,123 @@
+import os
+import unittest
+from assets import AssetManifest, fingerprint_static, fingerprinted_name
+from leafnode import LeafNode
+from parentnode import ParentNode
+from initilizer import generate_pages_recursive
+from sitetest import SiteTestCase
+
+
+class TestAssetManifest(unittest.TestCase):
+    def setUp(self):
+        self.assets = AssetManifest({"/index.css": "/index.abc.css", "/images/a.png": "/images/a.def.png"})
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("index.css", "0123456789abcdef"), "index.0123456789.css")
+        self.assertEqual(fingerprinted_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_url_for_keeps_query_and_fragment(self):
+        self.assertEqual(self.assets.url_for("/index.css?v=1"), "/index.abc.css?v=1")
+        self.assertEqual(self.assets.url_for("/images/a.png#top"), "/images/a.def.png#top")
+        self.assertEqual(self.assets.url_for("/unknown.css"), "/unknown.css")
+
+    def test_rewrite_html(self):
+        html = '<link href="/index.css" rel="stylesheet"><img src=\'/images/a.png\'><a href="/about">x</a>'
+        self.assertEqual(
+            self.assets.rewrite_html(html),
+            '<link href="/index.abc.css" rel="stylesheet"><img src=\'/images/a.def.png\'><a href="/about">x</a>',
+        )
+
+    def test_rewrite_node(self):
+        image = LeafNode("img", "", {"src": "/images/a.png", "alt": "A"})
+        text = LeafNode(None, "plain")
+        tree = ParentNode("p", [image, text, LeafNode("a", "link", {"href": "https://example.com/index.css"})])
+        self.assets.rewrite_node(tree)
+        self.assertEqual(
+            tree.to_html(),
+            '<p><img src="/images/a.def.png" alt="A"></img>plain<a href="https://example.com/index.css">link</a></p>',
+        )
+
+    def test_rewrite_node_adds_image_sizes(self):
+        assets = AssetManifest(
+            self.assets.assets,
+            images={
+                "/images/a.png": {
+                    "width": 1200,
+                    "height": 800,
+                    "srcset": {".png": [["/images/a.def-480w.png", 480], ["/images/a.def.png", 1200]]},
+                }
+            },
+        )
+        tree = ParentNode("p", [LeafNode("img", "", {"src": "/images/a.png", "alt": "A"})])
+        assets.rewrite_node(tree)
+        self.assertEqual(
+            tree.to_html(),
+            '<p><img src="/images/a.def.png" alt="A" width="1200" height="800" '
+            'srcset="/images/a.def-480w.png 480w, /images/a.def.png 1200w" sizes="100vw"></img></p>',
+        )
+
+    def test_rewrite_node_wraps_webp_in_picture(self):
+        assets = AssetManifest(
+            images={"/a.png": {"width": 10, "height": 5, "srcset": {".png": [["/a.png", 10]], ".webp": [["/a.webp", 10]]}}}
+        )
+        tree = ParentNode("p", [LeafNode("img", "", {"src": "/a.png", "alt": "A"})])
+        assets.rewrite_node(tree)
+        self.assertEqual(
+            tree.to_html(),
+            '<p><picture><source type="image/webp" srcset="/a.webp 10w" sizes="100vw"></source>'
+            '<img src="/a.png" alt="A" width="10" height="5"></img></picture></p>',
+        )
+
+    def test_digest_changes_with_images(self):
+        images = {"/images/a.png": {"width": 1, "height": 1, "srcset": {}}}
+        self.assertNotEqual(self.assets.digest, AssetManifest(self.assets.assets, images).digest)
+
+    def test_digest_changes_with_assets(self):
+        self.assertNotEqual(self.assets.digest, AssetManifest({"/index.css": "/index.xyz.css"}).digest)
+
+    def test_digest_for_covers_only_the_urls_given(self):
+        changed = AssetManifest({**self.assets.assets, "/index.css": "/index.xyz.css"})
+        self.assertEqual(self.assets.digest_for(["/images/a.png?v=1"]), changed.digest_for(["/images/a.png"]))
+        self.assertNotEqual(self.assets.digest_for(["/index.css"]), changed.digest_for(["/index.css"]))
+        images = AssetManifest(self.assets.assets, {"/images/a.png": {"width": 1, "height": 1, "srcset": {}}})
+        self.assertNotEqual(self.assets.digest_for(["/images/a.png"]), images.digest_for(["/images/a.png"]))
+
+
+class TestFingerprintStatic(SiteTestCase):
+    TEMPLATE = '<link href="/index.css">{{ Content }}'
+
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def test_writes_hashed_copies(self):
+        manifest = fingerprint_static(self.static, self.public)
+        self.assertEqual(sorted(manifest.assets), ["/images/a.png", "/index.css"])
+        for url in manifest.assets.values():
+            self.assertTrue(os.path.exists(os.path.join(self.public, url.lstrip("/"))))
+
+    def test_unchanged_assets_keep_their_names(self):
+        first = fingerprint_static(self.static, self.public)
+        second = fingerprint_static(self.static, self.public, previous=first)
+        self.assertEqual(first.assets, second.assets)
+
+    def test_changed_asset_gets_new_name_and_old_one_is_removed(self):
+        first = fingerprint_static(self.static, self.public)
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        second = fingerprint_static(self.static, self.public, previous=first)
+        self.assertNotEqual(first.assets["/index.css"], second.assets["/index.css"])
+        self.assertEqual(first.assets["/images/a.png"], second.assets["/images/a.png"])
+        self.assertFalse(os.path.exists(os.path.join(self.public, first.assets["/index.css"].lstrip("/"))))
+
+    def test_pages_and_template_reference_fingerprinted_urls(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![a](/images/a.png)")
+        assets = fingerprint_static(self.static, self.public)
+        generate_pages_recursive(self.content, self.template, self.public, assets=assets)
+        html = self.read(os.path.join(self.public, "index.html"))
+        self.assertIn(f'href="{assets.assets["/index.css"]}"', html)
+        self.assertIn(f'src="{assets.assets["/images/a.png"]}"', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
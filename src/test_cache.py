@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+from assets import AssetManifest
+from cache import HTMLCache
+from initilizer import generate_page
+from template import Template
+
+
+class TestHTMLCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.root, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        cache = HTMLCache(self.cache_dir, version=1)
+        key = cache.key("# Title")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<h1>Title</h1>", "Title")
+        self.assertEqual(cache.get(key), ("<h1>Title</h1>", "Title"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.put(key, "<p>\nNo title\n</p>")
+        self.assertEqual(cache.get(key), ("<p>\nNo title\n</p>", None))
+
+    def test_key_depends_on_parser_version(self):
+        self.assertNotEqual(
+            HTMLCache(self.cache_dir, version=1).key("# Title"),
+            HTMLCache(self.cache_dir, version=2).key("# Title"),
+        )
+
+    def test_evicts_least_recently_used(self):
+        cache = HTMLCache(self.cache_dir, version=1, max_bytes=35)
+        keys = [cache.key(str(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, "x" * 10)
+            os.utime(cache.path_for(key), ns=(i * 10**9, i * 10**9))
+        # Reading the oldest entry makes it the most recently used one.
+        cache.get(keys[0])
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+    def test_evict_missing_directory(self):
+        self.assertEqual(HTMLCache(self.cache_dir, version=1).evict(), 0)
+
+    def test_generate_page_uses_cached_body(self):
+        source = os.path.join(self.root, "index.md")
+        dest = os.path.join(self.root, "index.html")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("# Title\n\nBody")
+        cache = HTMLCache(self.cache_dir, version=1)
+        template = Template("{{ Title }}|{{ Content }}")
+
+        stats = generate_page(source, template, dest, cache=cache)
+        self.assertEqual(stats["cache_misses"], 1)
+        with open(dest, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Title|<div><h1>Title</h1><p>Body</p></div>")
+
+        cache.put(cache.key("# Title\n\nBody"), "<p>from cache</p>", "Cached")
+        stats = generate_page(source, template, dest, cache=cache)
+        self.assertEqual(stats["cache_hits"], 1)
+        with open(dest, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Cached|<p>from cache</p>")
+
+    def test_title_is_the_same_on_a_hit(self):
+        # The "# " line inside the fence is not a heading, so the title is the one after it.
+        source = os.path.join(self.root, "index.md")
+        dest = os.path.join(self.root, "index.html")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("```\n# not a title\n```\n\n# Real Title\n")
+        cache = HTMLCache(self.cache_dir, version=1)
+        template = Template("{{ Title }}")
+
+        outputs = []
+        for _ in range(2):
+            generate_page(source, template, dest, cache=cache)
+            with open(dest, encoding="utf-8") as f:
+                outputs.append(f.read())
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+        self.assertEqual(outputs, ["Real Title", "Real Title"])
+
+    def test_unrelated_asset_change_keeps_cached_body(self):
+        source = os.path.join(self.root, "index.md")
+        dest = os.path.join(self.root, "index.html")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("# Title\n\n![Logo](/logo.png)")
+        cache = HTMLCache(self.cache_dir, version=1)
+        template = Template("{{ Content }}")
+
+        generate_page(source, template, dest, cache=cache, assets=AssetManifest({"/logo.png": "/logo.a.png"}))
+        assets = AssetManifest({"/logo.png": "/logo.a.png", "/index.css": "/index.b.css"})
+        self.assertEqual(generate_page(source, template, dest, cache=cache, assets=assets)["cache_hits"], 1)
+        assets = AssetManifest({"/logo.png": "/logo.c.png"})
+        self.assertEqual(generate_page(source, template, dest, cache=cache, assets=assets)["cache_misses"], 1)
+        with open(dest, encoding="utf-8") as f:
+            self.assertIn('src="/logo.c.png"', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
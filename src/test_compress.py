@@ -0,0 +1,74 @@
+import gzip
+import os
+import unittest
+from compress import compress_file, compress_tree
+from sitetest import SiteTestCase
+
+HTML = "<html><body>" + "<p>All that is gold does not glitter</p>" * 50 + "</body></html>"
+
+
+class TestCompress(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = self.write(os.path.join(self.public, "index.html"), HTML)
+
+    def test_writes_gzip_sidecar(self):
+        stats = compress_file(self.page, ["gz"])
+        self.assertEqual(stats["written"], 1)
+        with gzip.open(self.page + ".gz", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), HTML)
+        self.assertEqual(os.stat(self.page + ".gz").st_mtime_ns, os.stat(self.page).st_mtime_ns)
+
+    def test_output_is_deterministic(self):
+        compress_file(self.page, ["gz"])
+        with open(self.page + ".gz", "rb") as f:
+            first = f.read()
+        os.remove(self.page + ".gz")
+        compress_file(self.page, ["gz"])
+        with open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_up_to_date_sidecar_is_skipped(self):
+        compress_file(self.page, ["gz"])
+        self.assertEqual(compress_file(self.page, ["gz"])["fresh"], 1)
+
+        self.write(self.page, HTML + "<!-- changed -->")
+        os.utime(self.page, ns=(1, 1))
+        self.assertEqual(compress_file(self.page, ["gz"])["written"], 1)
+
+    def test_small_or_incompressible_files_are_skipped(self):
+        small = os.path.join(self.public, "small.css")
+        self.write(small, "body{}")
+        noise = os.path.join(self.public, "noise.js")
+        with open(noise, "wb") as f:
+            f.write(os.urandom(4096))
+        self.assertEqual(compress_file(small, ["gz"])["not_worth_it"], 1)
+        self.assertEqual(compress_file(noise, ["gz"])["not_worth_it"], 1)
+        self.assertFalse(os.path.exists(small + ".gz"))
+        self.assertFalse(os.path.exists(noise + ".gz"))
+
+    def test_compress_tree(self):
+        self.write(os.path.join(self.public, "blog", "post.html"), HTML)
+        self.write(os.path.join(self.public, "image.png"), HTML)
+        stats = compress_tree(self.public, formats=["gz"], jobs=2)
+        self.assertEqual(stats["written"], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post.html.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "image.png.gz")))
+
+    def test_orphaned_sidecars_are_removed(self):
+        compress_tree(self.public, formats=["gz"])
+        archive = os.path.join(self.public, "data.tar.gz")
+        self.write(archive, "not a sidecar")
+        os.remove(self.page)
+        stats = compress_tree(self.public, formats=["gz"])
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertTrue(os.path.exists(archive))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            compress_tree(self.public, formats=["zstd"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import unittest
+from assets import AssetManifest
+from depgraph import DependencyGraph
+from images import changed_images
+from initilizer import generate_pages_recursive
+from sitetest import SiteTestCase
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph("deps.json", "content", "static")
+
+    def test_page_dependencies(self):
+        markdown = (
+            "# Post\n\n![Logo](/images/logo.png) ![Remote](https://example.com/a.png) ![Near](diagram.svg)\n\n"
+            "[Home](/) [Sibling](other) [Guide](/docs/guide.html#intro) [PDF](/files/a.pdf) "
+            "[Wiki](https://example.com/wiki) [Top](#top) [Mail](mailto:me@example.com)"
+        )
+        assets, links = self.graph.page_dependencies(os.path.join("content", "blog", "post.md"), markdown)
+        self.assertEqual(
+            assets,
+            sorted(
+                [
+                    os.path.join("static", "blog", "diagram.svg"),
+                    os.path.join("static", "files", "a.pdf"),
+                    os.path.join("static", "images", "logo.png"),
+                ]
+            ),
+        )
+        self.assertEqual(
+            links,
+            sorted(
+                [
+                    os.path.join("content", "index.md"),
+                    os.path.join("content", "blog", "other.md"),
+                    os.path.join("content", "blog", "other", "index.md"),
+                    os.path.join("content", "docs", "guide.md"),
+                ]
+            ),
+        )
+
+    def test_affected(self):
+        home = os.path.join("content", "index.md")
+        post = os.path.join("content", "post.md")
+        logo = os.path.join("static", "logo.png")
+        self.graph.record(home, "index.html", "template.html", "# Home\n\n[Post](/post)")
+        self.graph.record(post, "post.html", "template.html", "# Post\n\n![Logo](/logo.png)")
+
+        self.assertEqual(self.graph.affected([logo]), {post})
+        self.assertEqual(self.graph.affected(["template.html"]), {home, post})
+        # Editing a linked page doesn't change the pages linking to it...
+        self.assertEqual(self.graph.affected([post]), {post})
+        # ...but adding or removing it does.
+        self.assertEqual(self.graph.affected([], [post]), {home})
+
+    def test_save_and_load(self):
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, "cache", "deps.json")
+            graph = DependencyGraph(path, "content", "static")
+            graph.record(os.path.join("content", "index.md"), "index.html", "template.html", "![A](/a.png)")
+            graph.save()
+            loaded = DependencyGraph.load(path, "content", "static")
+            self.assertEqual(loaded.pages, graph.pages)
+            self.assertEqual(loaded.dump(), graph.dump())
+        finally:
+            shutil.rmtree(root)
+
+
+class TestMinimalRebuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[About](/about)")
+        self.write(os.path.join(self.content, "post.md"), "# Post\n\n![Logo](/logo.png)")
+
+    def build(self, assets=None, changed=()):
+        graph = DependencyGraph.load(os.path.join(self.cache, "deps.json"), self.content, self.static)
+        super().build(assets=assets, graph=graph, changed=changed)
+        graph.save()
+        outputs = {}
+        for name in os.listdir(self.public):
+            path = os.path.join(self.public, name)
+            outputs[name] = os.stat(path).st_mtime_ns
+            os.utime(path, ns=(0, 0))
+        return {name for name, mtime in outputs.items() if mtime != 0}
+
+    def test_asset_change_rebuilds_only_pages_using_it(self):
+        self.build(AssetManifest({"/logo.png": "/logo.a.png"}))
+        rebuilt = self.build(AssetManifest({"/logo.png": "/logo.b.png"}), changed=[os.path.join(self.static, "logo.png")])
+        self.assertEqual(rebuilt, {"post.html"})
+
+    def test_image_change_rebuilds_only_pages_using_it(self):
+        small = {"/logo.png": {"width": 10, "height": 10, "srcset": {}, "files": ["/logo.png"]}}
+        large = {"/logo.png": {"width": 20, "height": 20, "srcset": {}, "files": ["/logo.png"]}}
+        self.build(AssetManifest(images=small))
+        self.assertEqual(self.build(AssetManifest(images=small)), set())
+        # The source image is unchanged; only its entry in the image index differs.
+        changed = [os.path.join(self.static, url.lstrip("/")) for url in changed_images(small, large)]
+        self.assertEqual(self.build(AssetManifest(images=large), changed=changed), {"post.html"})
+
+    def test_enabling_images_rebuilds_every_page(self):
+        self.build(AssetManifest())
+        self.build(AssetManifest(images={"/logo.png": {"width": 10, "height": 10, "srcset": {}, "files": []}}))
+        self.assertEqual(self.stats["pages"], 2)
+
+    def test_graph_is_recorded_in_every_build_mode(self):
+        expected = DependencyGraph("deps.json", self.content, self.static)
+        for name in ("index", "post"):
+            source = os.path.join(self.content, f"{name}.md")
+            with open(source, encoding="utf-8") as f:
+                expected.record(source, os.path.join(self.public, f"{name}.html"), self.template, f.read())
+        for jobs, pipelined in ((1, False), (2, False), (2, True)):
+            graph = DependencyGraph("deps.json", self.content, self.static)
+            generate_pages_recursive(self.content, self.template, self.public, graph=graph, jobs=jobs, pipelined=pipelined)
+            self.assertEqual(graph.pages, expected.pages)
+
+    def test_new_page_rebuilds_pages_linking_to_it(self):
+        self.build()
+        self.write(os.path.join(self.content, "about.md"), "# About")
+        # index.html is regenerated, but its HTML is the same so the file is left alone.
+        self.assertEqual(self.build(), {"about.html"})
+        self.assertEqual(self.stats["pages"], 2)
+        self.assertEqual(self.stats["unchanged"], 1)
+        self.assertEqual(self.build(), set())
+        self.assertEqual(self.stats["pages"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import unittest
+from assets import AssetManifest
+from devserver import LIVERELOAD_SCRIPT, ReloadBroadcaster, SiteWatcher, inject_livereload
+from sitetest import SiteTestCase
+
+
+class TestInjectLivereload(unittest.TestCase):
+    def test_injects_before_body_close(self):
+        html = inject_livereload("<html><body><p>Hi</p></body></html>")
+        self.assertEqual(html, f"<html><body><p>Hi</p>{LIVERELOAD_SCRIPT}</body></html>")
+
+    def test_appends_without_body(self):
+        self.assertEqual(inject_livereload("<p>Hi</p>"), f"<p>Hi</p>{LIVERELOAD_SCRIPT}")
+
+
+class TestReloadBroadcaster(unittest.TestCase):
+    def test_reload_reaches_subscribers(self):
+        broadcaster = ReloadBroadcaster()
+        client = broadcaster.subscribe()
+        self.assertEqual(broadcaster.reload(), 1)
+        self.assertEqual(client.get_nowait(), "reload")
+        broadcaster.unsubscribe(client)
+        self.assertEqual(broadcaster.reload(), 0)
+
+
+class TestSiteWatcher(SiteTestCase):
+    TEMPLATE = "{{ Title }}|{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.public)
+
+    def rebuild(self):
+        return self.watcher.rebuild(*self.watcher.poll())
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), (set(), set()))
+
+    def test_page_change_rebuilds_only_that_page(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited post")
+        outputs = self.rebuild()
+        dest = os.path.join(self.public, "blog", "post.html")
+        self.assertEqual(outputs, [dest])
+        self.assertEqual(self.read(dest), "Edited post|<div><h1>Edited post</h1></div>")
+
+    def test_template_change_rebuilds_every_page(self):
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        outputs = self.rebuild()
+        self.assertEqual(
+            sorted(outputs),
+            [os.path.join(self.public, "blog", "post.html"), os.path.join(self.public, "index.html")],
+        )
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")), "<title>Home</title><div><h1>Home</h1></div>")
+
+    def test_static_change_is_copied(self):
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        self.assertEqual(self.rebuild(), [os.path.join(self.public, "index.css")])
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body { margin: 0 }")
+
+    def test_md_inside_a_name_is_kept(self):
+        self.assertEqual(
+            self.watcher.page_dest(os.path.join(self.content, "notes.md.d", "a.md")),
+            os.path.join(self.public, "notes.md.d", "a.html"),
+        )
+
+    def test_pages_use_the_build_assets(self):
+        assets = AssetManifest({"/index.css": "/index.abc.css"})
+        assets.images = {"/logo.png": {"width": 4, "height": 3, "srcset": {}, "files": ["/logo.png"]}}
+        self.write(self.template, '<link href="/index.css">{{ Content }}')
+        watcher = SiteWatcher(self.content, self.static, self.template, self.public, assets=assets)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![Logo](/logo.png)")
+        watcher.rebuild(*watcher.poll())
+        self.assertEqual(
+            self.read(os.path.join(self.public, "index.html")),
+            '<link href="/index.abc.css"><div><h1>Home</h1><p><img src="/logo.png" alt="Logo" loading="lazy" width="4" height="3"></img></p></div>',
+        )
+
+    def test_ignored_files_are_not_watched(self):
+        self.write(os.path.join(self.content, ".siteignore"), "drafts/\n")
+        os.makedirs(os.path.join(self.content, "drafts"))
+        watcher = SiteWatcher(self.content, self.static, self.template, self.public, exclude=["*.tmp"])
+        self.write(os.path.join(self.content, "drafts", "wip.md"), "# WIP")
+        self.write(os.path.join(self.static, "upload.tmp"), "partial")
+        self.assertEqual(watcher.poll(), (set(), set()))
+
+    def test_removed_page_output_is_deleted(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post!")
+        self.rebuild()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(self.rebuild(), [os.path.join(self.public, "blog", "post.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
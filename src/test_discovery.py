@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import unittest
+from discovery import IGNORE_FILE, IgnoreRules, scan_tree
+from initilizer import discover_pages
+
+
+class TestIgnoreRules(unittest.TestCase):
+    def test_unanchored_names_match_at_any_depth(self):
+        rules = IgnoreRules(["*.tmp", "drafts"])
+        self.assertTrue(rules.is_ignored("a.tmp"))
+        self.assertTrue(rules.is_ignored("blog/2024/a.tmp"))
+        self.assertTrue(rules.is_ignored("blog/drafts", is_dir=True))
+        self.assertFalse(rules.is_ignored("a.tmp.md"))
+        self.assertFalse(rules.is_ignored("blog/drafts.md.bak/x"))
+
+    def test_slash_anchors_to_root(self):
+        rules = IgnoreRules(["/build", "docs/*.md"])
+        self.assertTrue(rules.is_ignored("build", is_dir=True))
+        self.assertFalse(rules.is_ignored("src/build", is_dir=True))
+        self.assertTrue(rules.is_ignored("docs/a.md"))
+        self.assertFalse(rules.is_ignored("docs/api/a.md"))
+
+    def test_double_star(self):
+        rules = IgnoreRules(["docs/**/*.md", "**/cache"])
+        self.assertTrue(rules.is_ignored("docs/a.md"))
+        self.assertTrue(rules.is_ignored("docs/api/v1/a.md"))
+        self.assertTrue(rules.is_ignored("a/b/cache", is_dir=True))
+
+    def test_trailing_slash_matches_directories_only(self):
+        rules = IgnoreRules(["tmp/"])
+        self.assertTrue(rules.is_ignored("tmp", is_dir=True))
+        self.assertFalse(rules.is_ignored("tmp"))
+
+    def test_last_matching_rule_wins(self):
+        rules = IgnoreRules(["*.png", "!keep.png", "# comment", ""])
+        self.assertTrue(rules.is_ignored("a.png"))
+        self.assertFalse(rules.is_ignored("images/keep.png"))
+        self.assertEqual(len(rules.rules), 2)
+
+    def test_character_classes(self):
+        rules = IgnoreRules(["file[0-9].txt", "x[!a].txt"])
+        self.assertTrue(rules.is_ignored("file7.txt"))
+        self.assertFalse(rules.is_ignored("filea.txt"))
+        self.assertTrue(rules.is_ignored("xb.txt"))
+        self.assertFalse(rules.is_ignored("xa.txt"))
+
+
+class TestScanTree(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for rel_path in ["b.md", "a/z.md", "a/b/c.md", "a.md", "drafts/x.md", "notes.txt", "a/b/d.png"]:
+            path = os.path.join(self.root, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(rel_path)
+        os.makedirs(os.path.join(self.root, "empty"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def rel_paths(self, tree):
+        return [rel_path.replace(os.sep, "/") for rel_path, _ in tree.files]
+
+    def test_files_are_sorted_by_path_components(self):
+        tree = scan_tree(self.root)
+        self.assertEqual(
+            self.rel_paths(tree),
+            ["a/b/c.md", "a/b/d.png", "a/z.md", "a.md", "b.md", "drafts/x.md", "notes.txt"],
+        )
+        self.assertEqual([d.replace(os.sep, "/") for d in tree.dirs], ["a", "a/b", "drafts", "empty"])
+
+    def test_ignore_file_and_exclude_patterns(self):
+        with open(os.path.join(self.root, IGNORE_FILE), "w", encoding="utf-8") as f:
+            f.write("# private\ndrafts/\n")
+        tree = scan_tree(self.root, exclude=["*.png", "*.txt"])
+        self.assertEqual(self.rel_paths(tree), ["a/b/c.md", "a/z.md", "a.md", "b.md"])
+        self.assertNotIn("drafts", tree.dirs)
+
+    def test_entries_carry_stat_info(self):
+        tree = scan_tree(self.root)
+        rel_path, entry = tree.files[0]
+        self.assertEqual(entry.stat().st_size, len("a/b/c.md"))
+        self.assertEqual(entry.path, os.path.join(self.root, rel_path))
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    def test_symlinked_directories_are_followed_without_loops(self):
+        shared = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, shared)
+        with open(os.path.join(shared, "s.md"), "w", encoding="utf-8") as f:
+            f.write("shared")
+        os.symlink(shared, os.path.join(self.root, "linked"))
+        os.symlink(self.root, os.path.join(self.root, "a", "loop"))
+        with self.assertLogs("discovery", "WARNING") as logs:
+            tree = scan_tree(self.root)
+        self.assertIn("linked/s.md", self.rel_paths(tree))
+        self.assertIn("linked", tree.dirs)
+        self.assertFalse(any("loop" in rel_path for rel_path in self.rel_paths(tree)))
+        self.assertEqual(len(logs.output), 1)
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    def test_mutually_linked_directories_are_scanned_once(self):
+        for name in ("x", "y"):
+            os.makedirs(os.path.join(self.root, name))
+        os.symlink(os.path.join(self.root, "y"), os.path.join(self.root, "x", "to_y"))
+        os.symlink(os.path.join(self.root, "x"), os.path.join(self.root, "y", "to_x"))
+        with self.assertLogs("discovery", "WARNING") as logs:
+            tree = scan_tree(self.root)
+        self.assertIn(os.path.join("x", "to_y"), tree.dirs)
+        self.assertNotIn(os.path.join("x", "to_y", "to_x"), tree.dirs)
+        self.assertIn(os.path.join("y", "to_x"), tree.dirs)
+        self.assertEqual(len(logs.output), 2)
+
+    def test_missing_root_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            scan_tree(os.path.join(self.root, "missing"))
+
+    def test_discover_pages_uses_a_shared_tree(self):
+        tree = scan_tree(self.root, exclude=["drafts/"])
+        pages = discover_pages(self.root, "public", tree)
+        self.assertEqual(
+            [dest for _, dest in pages],
+            [os.path.join("public", *name.split("/")) for name in ["a/b/c.html", "a/z.html", "a.html", "b.html"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from frontmatter import FrontMatterError, Page, read_front_matter, split_front_matter
+from initilizer import generate_page
+
+YAML_PAGE = """---
+title: "Riddles in the Dark"
+date: 2024-05-01
+draft: false
+weight: 3
+tags: [hobbits, 'gollum', "caves"]
+authors:
+  - Bilbo
+  - Frodo
+# a comment
+---
+# Chapter Five
+
+Body text.
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml(self):
+        metadata, body = split_front_matter(YAML_PAGE)
+        self.assertEqual(
+            metadata,
+            {
+                "title": "Riddles in the Dark",
+                "date": "2024-05-01",
+                "draft": False,
+                "weight": 3,
+                "tags": ["hobbits", "gollum", "caves"],
+                "authors": ["Bilbo", "Frodo"],
+            },
+        )
+        self.assertEqual(body, "# Chapter Five\n\nBody text.\n")
+
+    def test_toml(self):
+        metadata, body = split_front_matter('+++\ntitle = "A = B"\nrating = 4.5\nlinks = []\n+++\nBody')
+        self.assertEqual(metadata, {"title": "A = B", "rating": 4.5, "links": []})
+        self.assertEqual(body, "Body")
+
+    def test_without_front_matter(self):
+        for markdown in ["# Title\n\nBody", "---\n\nA thematic break, never closed", ""]:
+            with self.subTest(markdown=markdown):
+                self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_invalid_line_raises(self):
+        with self.assertRaises(FrontMatterError) as ctx:
+            split_front_matter("---\ntitle: ok\nnot a pair\n---\n")
+        self.assertEqual(ctx.exception.line_number, 3)
+        with self.assertRaises(FrontMatterError):
+            split_front_matter('+++\ntitle = "unterminated\n+++\n')
+
+
+class TestPage(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_metadata_reads_only_the_header(self):
+        # The body isn't valid UTF-8, so reading it would fail.
+        path = self.write("page.md", b"---\ntitle: Header only\n---\n\xff\xfe")
+        self.assertEqual(read_front_matter(path), {"title": "Header only"})
+        page = Page(path)
+        self.assertEqual(page.title, "Header only")
+        self.assertIsNone(page._markdown)
+
+    def test_source_is_read_on_first_use(self):
+        path = self.write("page.md", b"---\ntitle: Declared\n---\n# Heading\n")
+        page = Page(path)
+        self.assertIsNone(page._markdown)
+        self.assertEqual(page.title, "Declared")
+        self.assertEqual(page.body, "# Heading\n")
+        self.assertEqual(Page(path, "# Given\n").title, "Given")
+
+    def test_title_falls_back_to_h1(self):
+        page = Page(self.write("page.md", b"---\ndate: 2024-05-01T10:00:00\n---\n# From the body\n"))
+        self.assertEqual(page.title, "From the body")
+        self.assertEqual(page.date, datetime(2024, 5, 1, 10))
+
+    def test_pages_sort_by_date(self):
+        pages = [
+            Page(self.write(f"{name}.md", f"---\ndate: {date}\n---\n# {name}\n".encode()))
+            for name, date in [("b", "2024-02-01"), ("a", "2023-12-24"), ("c", "2024-01-15")]
+        ]
+        self.assertEqual([page.title for page in sorted(pages, key=lambda page: page.date)], ["a", "c", "b"])
+
+    def test_front_matter_feeds_the_template(self):
+        template = self.write(
+            "template.html", b'<title>{{ Title }}</title><meta name="{{ Title }}" content="{{ Tags }}">{{ Content }}'
+        )
+        source = self.write("page.md", b'---\ntitle: Fish & "Chips"\ntags: [a, b]\n---\n# Heading\n\nText')
+        dest = os.path.join(self.root, "page.html")
+        generate_page(source, template, dest)
+        with open(dest, encoding="utf-8") as f:
+            self.assertEqual(
+                f.read(),
+                '<title>Fish &amp; &quot;Chips&quot;</title><meta name="Fish &amp; &quot;Chips&quot;" content="a, b">'
+                "<div><h1>Heading</h1><p>Text</p></div>",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from highlight import HIGHLIGHTER_VERSION, HighlightCache, RegexLexer, get_lexer, register_lexer
+
+
+def render(nodes):
+    return "".join(node.to_html() for node in nodes)
+
+
+class TestLexers(unittest.TestCase):
+    def test_python(self):
+        code = 'def f(x=None):\n    return "a # b"  # c\n'
+        self.assertEqual(
+            list(get_lexer("python").tokenize(code)),
+            [
+                ("k", "def"),
+                (None, " f(x="),
+                ("kc", "None"),
+                (None, "):\n    "),
+                ("k", "return"),
+                (None, " "),
+                ("s", '"a # b"'),
+                (None, "  "),
+                ("c", "# c"),
+                (None, "\n"),
+            ],
+        )
+
+    def test_keywords_need_word_boundaries(self):
+        self.assertEqual(list(get_lexer("py").tokenize("format_in = 10x")), [(None, "format_in = 10x")])
+
+    def test_names_are_case_insensitive(self):
+        self.assertIs(get_lexer("JS"), get_lexer("javascript"))
+        self.assertIsNone(get_lexer("cobol"))
+
+    def test_tokens_cover_the_input(self):
+        code = 'for f in *.md; do echo "$f" # x\ndone'
+        self.assertEqual("".join(text for _, text in get_lexer("bash").tokenize(code)), code)
+
+    def test_register_lexer(self):
+        register_lexer(RegexLexer([("k", r"\bSELECT\b")]), "test-sql")
+        self.assertEqual(list(get_lexer("test-sql").tokenize("SELECT 1")), [("k", "SELECT"), (None, " 1")])
+
+
+class TestHighlightCache(unittest.TestCase):
+    def test_repeated_snippets_hit(self):
+        cache = HighlightCache()
+        first = cache.highlight("x = True", "python")
+        second = cache.highlight("x = True", "Python")
+        self.assertEqual(render(first), 'x = <span class="kc">True</span>')
+        self.assertEqual(render(second), render(first))
+        self.assertIsNot(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key_includes_language_and_version(self):
+        cache = HighlightCache()
+        self.assertNotEqual(cache.key("python", "x"), cache.key("js", "x"))
+        self.assertEqual(cache.key("python", "x")[2], HIGHLIGHTER_VERSION)
+
+    def test_unknown_language_is_not_cached(self):
+        cache = HighlightCache()
+        self.assertIsNone(cache.highlight("x", "cobol"))
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_oldest_entries_are_dropped(self):
+        cache = HighlightCache(max_entries=2)
+        for code in ("a", "b", "c"):
+            cache.highlight(code, "python")
+        self.assertEqual(len(cache.entries), 2)
+        cache.highlight("a", "python")
+        self.assertEqual(cache.misses, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -57,7 +57,7 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode()
         self.assertIsNone(node.tag)
         self.assertIsNone(node.value)
-        self.assertEqual(node.children, [])
+        self.assertEqual(node.children, ())
         self.assertEqual(node.props, {})
 
     def test_nested_nodes(self):
@@ -101,5 +101,44 @@ class TestHTMLNode(unittest.TestCase):
         )
         self.assertEqual(repr(parent), expected_repr)
 
+    def test_empty_defaults_are_shared_and_read_only(self):
+        """Test that nodes without children or props share immutable defaults."""
+        first = HTMLNode(tag="p", value="one")
+        second = HTMLNode(tag="p", value="two")
+        self.assertIs(first.children, second.children)
+        self.assertIs(first.props, second.props)
+        with self.assertRaises(TypeError):
+            first.props["id"] = "x"
+
+    def test_props_are_escaped(self):
+        """Test that quotes and ampersands can't break out of an attribute."""
+        node = HTMLNode(props={"href": '/search?q=a&b="c"', "alt": "<x>"})
+        self.assertEqual(node.props_to_html(), ' href="/search?q=a&amp;b=&quot;c&quot;" alt="<x>"')
+
+    def test_replacing_props_rerenders_attributes(self):
+        """Test that the cached attribute string follows a props replacement."""
+        node = HTMLNode(tag="a", props={"href": "/old"})
+        self.assertEqual(node.props_to_html(), ' href="/old"')
+        node.props = {"href": "/new"}
+        self.assertEqual(node.props_to_html(), ' href="/new"')
+
+    def test_props_cannot_go_stale(self):
+        """Test that props can't change behind the cached attribute string."""
+        props = {"href": "/old"}
+        node = HTMLNode(tag="a", props=props)
+        self.assertEqual(node.props_to_html(), ' href="/old"')
+        props["href"] = "/new"
+        self.assertEqual(node.props_to_html(), ' href="/old"')
+        with self.assertRaises(TypeError):
+            node.props["href"] = "/new"
+        self.assertEqual(node.props, {"href": "/old"})
+
+    def test_no_instance_dict(self):
+        """Test that nodes are slotted."""
+        node = HTMLNode(tag="p", value="text")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
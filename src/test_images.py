@@ -0,0 +1,112 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+from images import changed_images, image_paths, image_size, iter_png_chunks, optimize_images, optimize_png, png_chunk, PNG_SIGNATURE
+from discovery import scan_tree
+from initilizer import sync_static
+
+
+def make_png(width, height, text=None):
+    raw = b"".join(b"\x00" + bytes((x * 7 + y) % 256 for x in range(width * 3)) for y in range(height))
+    chunks = [png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))]
+    if text is not None:
+        chunks.append(png_chunk(b"tEXt", text))
+    chunks.append(png_chunk(b"IDAT", zlib.compress(raw, 0)))
+    chunks.append(png_chunk(b"IEND", b""))
+    return PNG_SIGNATURE + b"".join(chunks)
+
+
+def idat_pixels(data):
+    return zlib.decompress(b"".join(payload for chunk_type, payload in iter_png_chunks(data) if chunk_type == b"IDAT"))
+
+
+class TestImageSize(unittest.TestCase):
+    def test_png(self):
+        self.assertEqual(image_size(make_png(30, 20)), (30, 20))
+
+    def test_jpeg(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, 480, 640, 1) + b"\x01\x11\x00"
+        self.assertEqual(image_size(b"\xff\xd8" + app0 + sof0 + b"\xff\xd9"), (640, 480))
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            image_size(b"GIF89a")
+
+
+class TestOptimizePng(unittest.TestCase):
+    def test_recompression_is_lossless(self):
+        data = make_png(64, 64, text=b"Comment\x00made by a camera")
+        optimized = optimize_png(data)
+        self.assertLess(len(optimized), len(data))
+        self.assertEqual(idat_pixels(optimized), idat_pixels(data))
+        self.assertEqual(image_size(optimized), (64, 64))
+        self.assertNotIn(b"tEXt", [chunk_type for chunk_type, _ in iter_png_chunks(optimized)])
+
+    def test_never_grows(self):
+        data = optimize_png(make_png(8, 8))
+        self.assertEqual(optimize_png(data), data)
+
+
+class TestOptimizeImages(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.cache = os.path.join(self.root, "cache")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.png = make_png(40, 30)
+        with open(os.path.join(self.static, "images", "a.png"), "wb") as f:
+            f.write(self.png)
+        with open(os.path.join(self.static, "index.css"), "w", encoding="utf-8") as f:
+            f.write("body {}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_writes_optimized_image_and_index(self):
+        images, stats = optimize_images(self.static, self.public, self.cache, widths=())
+        self.assertEqual(list(images), ["/images/a.png"])
+        self.assertEqual((images["/images/a.png"]["width"], images["/images/a.png"]["height"]), (40, 30))
+        self.assertEqual(stats["images"], 1)
+        self.assertEqual(stats["written"], 1)
+        with open(os.path.join(self.public, "images", "a.png"), "rb") as f:
+            optimized = f.read()
+        self.assertLess(len(optimized), len(self.png))
+        self.assertEqual(idat_pixels(optimized), idat_pixels(self.png))
+
+    def test_results_are_cached(self):
+        optimize_images(self.static, self.public, self.cache, widths=())
+        _, stats = optimize_images(self.static, self.public, self.cache, widths=())
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(stats["cache_misses"], 0)
+        self.assertEqual(stats["written"], 0)
+
+    def test_synced_originals_are_not_recopied(self):
+        for _ in range(2):
+            report = sync_static(self.static, self.public, owned=image_paths(scan_tree(self.static)))
+            _, stats = optimize_images(self.static, self.public, self.cache, widths=())
+        self.assertEqual((report.copied, report.skipped), (0, 2))
+        self.assertEqual(stats["written"], 0)
+        with open(os.path.join(self.public, "images", "a.png"), "rb") as f:
+            self.assertLess(len(f.read()), len(self.png))
+
+    def test_changed_images(self):
+        previous = {"/a.png": {"width": 1}, "/b.png": {"width": 2}, "/gone.png": {"width": 3}}
+        images = {"/a.png": {"width": 1}, "/b.png": {"width": 4}, "/new.png": {"width": 5}}
+        self.assertEqual(changed_images(previous, images), ["/b.png", "/gone.png", "/new.png"])
+
+    def test_removed_images_are_cleaned_up(self):
+        previous, _ = optimize_images(self.static, self.public, self.cache, widths=())
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        images, stats = optimize_images(self.static, self.public, self.cache, previous=previous, widths=())
+        self.assertEqual(images, {})
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "a.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
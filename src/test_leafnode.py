@@ -1,3 +1,4 @@
+import io
 import unittest
 from leafnode import LeafNode
 
@@ -38,5 +39,31 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("span", 12345)
         self.assertEqual(node.to_html(), "<span>12345</span>")
 
+    def test_text_is_escaped(self):
+        node = LeafNode("code", "if a < b && c > d:")
+        self.assertEqual(node.to_html(), "<code>if a &lt; b &amp;&amp; c > d:</code>")
+        self.assertEqual(LeafNode(None, "Fish & chips").to_html(), "Fish &amp; chips")
+
+    def test_text_without_special_characters_is_not_copied(self):
+        value = "Plain words"
+        self.assertIs(LeafNode(None, value).to_html(), value)
+
+    def test_replacing_value_reescapes(self):
+        node = LeafNode("b", "plain")
+        node.value = "a < b"
+        self.assertEqual(node.value, "a < b")
+        self.assertEqual(node.to_html(), "<b>a &lt; b</b>")
+
+    def test_write_html(self):
+        node = LeafNode("a", "Click me!", {"href": "https://www.google.com"})
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertEqual(list(node.iter_html()), [node.to_html()])
+
+    def test_no_instance_dict(self):
+        node = LeafNode("b", "Bold")
+        self.assertFalse(hasattr(node, "__dict__"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+import unittest
+from unittest import mock
+from highlight import HIGHLIGHTER_VERSION
+from manifest import BuildManifest, hash_bytes, hash_file, load_versioned_json, save_versioned_json
+from misc import PARSER_VERSION
+from initilizer import generate_pages_recursive, remove_stale_pages, write_output
+from sitetest import SiteTestCase
+
+
+class TestIncrementalBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nHello")
+
+    def mtimes(self):
+        return {
+            name: os.stat(os.path.join(self.public, name)).st_mtime_ns
+            for name in ("index.html", os.path.join("blog", "post.html"))
+        }
+
+    def backdate_outputs(self):
+        for name in self.mtimes():
+            os.utime(os.path.join(self.public, name), ns=(0, 0))
+
+    def test_manifest_round_trip(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        source = os.path.join(self.content, "index.md")
+        entry = manifest.entries[source]
+        self.assertEqual(entry["source_hash"], hash_file(source))
+        self.assertEqual(
+            entry["template_hash"], hash_bytes(f"{PARSER_VERSION}\0{HIGHLIGHTER_VERSION}\0{self.TEMPLATE}".encode("utf-8"))
+        )
+        self.assertEqual(entry["dest_path"], os.path.join(self.public, "index.html"))
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        self.backdate_outputs()
+        self.build()
+        self.assertEqual(set(self.mtimes().values()), {0})
+
+    def test_changed_page_is_rebuilt(self):
+        self.build()
+        self.backdate_outputs()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        self.build()
+        mtimes = self.mtimes()
+        self.assertNotEqual(mtimes["index.html"], 0)
+        self.assertEqual(mtimes[os.path.join("blog", "post.html")], 0)
+
+    def test_template_change_rebuilds_every_page(self):
+        self.build()
+        self.backdate_outputs()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        self.assertNotIn(0, self.mtimes().values())
+
+    def test_parser_version_change_rebuilds_every_page(self):
+        self.build()
+        self.backdate_outputs()
+        with mock.patch("initilizer.PARSER_VERSION", PARSER_VERSION + 1):
+            stats = generate_pages_recursive(self.content, self.template, self.public, BuildManifest.load(self.manifest_path))
+        self.assertEqual(stats["pages"], 2)
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_prune_returns_outputs_of_deleted_sources(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        manifest = self.build()
+        self.assertEqual(manifest.prune(), [os.path.join(self.public, "blog", "post.html")])
+
+    def test_rebuild_all_regenerates_and_prunes(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.rebuild_all = True
+        stats = generate_pages_recursive(self.content, self.template, self.public, manifest)
+        self.assertEqual((stats["pages"], stats["unchanged"]), (1, 1))
+        remove_stale_pages(manifest, self.public)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertEqual(list(manifest.entries), [os.path.join(self.content, "index.md")])
+
+    def test_identical_output_is_not_rewritten(self):
+        generate_pages_recursive(self.content, self.template, self.public)
+        self.backdate_outputs()
+        # Same size as "Welcome", so the contents have to be hashed.
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcomE")
+        stats = generate_pages_recursive(self.content, self.template, self.public)
+        self.assertEqual((stats["written"], stats["unchanged"]), (1, 1))
+        mtimes = self.mtimes()
+        self.assertNotEqual(mtimes["index.html"], 0)
+        self.assertEqual(mtimes[os.path.join("blog", "post.html")], 0)
+        self.assertEqual(sorted(os.listdir(self.public)), ["blog", "index.html"])
+
+    def test_versioned_json_round_trip(self):
+        path = os.path.join(self.root, "cache", "data.json")
+        save_versioned_json(path, 3, {"pages": {"a": 1}})
+        self.assertEqual(load_versioned_json(path, 3), {"version": 3, "pages": {"a": 1}})
+        self.assertIsNone(load_versioned_json(path, 4))
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["data.json"])
+        self.write(path, "{not json")
+        self.assertIsNone(load_versioned_json(path, 3))
+        self.assertIsNone(load_versioned_json(os.path.join(self.root, "missing.json"), 3))
+
+    def test_write_output_replaces_atomically(self):
+        path = os.path.join(self.root, "out", "page.html")
+        self.assertTrue(write_output(path, "<p>one</p>"))
+        inode = os.stat(path).st_ino
+        self.assertFalse(write_output(path, "<p>one</p>"))
+        self.assertEqual(os.stat(path).st_ino, inode)
+        self.assertTrue(write_output(path, "<p>two</p>"))
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>two</p>")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["page.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
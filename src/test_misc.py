@@ -410,6 +410,37 @@ End of document.
         ]
         self.assertEqual(markdown_to_blocks(text), expected)
 
+    def test_fenced_code_keeps_blank_lines(self):
+        text = "Intro\n\n```\ndef f():\n\n    return 1\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(text),
+            ["Intro", "```\ndef f():\n\n    return 1\n```", "Outro"],
+        )
+
+    def test_unclosed_fence_runs_to_end(self):
+        self.assertEqual(markdown_to_blocks("```\na\n\nb"), ["```\na\n\nb"])
+
+    def test_single_line_fence_does_not_open_block(self):
+        self.assertEqual(markdown_to_blocks("```x```\n\npara"), ["```x```", "para"])
+
+    def test_whitespace_only_line_separates_blocks(self):
+        self.assertEqual(markdown_to_blocks("first\n   \nsecond"), ["first", "second"])
+
+    def test_block_spans_are_offsets(self):
+        text = "  # Title  \n\nBody text\r\n"
+        spans = list(iter_block_spans(text))
+        self.assertEqual(spans, [(2, 9), (13, 22)])
+        self.assertEqual([text[start:end] for start, end in spans], ["# Title", "Body text"])
+
+    def test_block_spans_are_lazy(self):
+        spans = iter_block_spans("a\n\nb")
+        self.assertEqual(next(spans), (0, 1))
+        self.assertEqual(next(spans), (3, 4))
+
+    def test_code_block_with_blank_line_to_html(self):
+        html = markdown_to_html_node("```\na = 1\n\nb = 2\n```").to_html()
+        self.assertEqual(html, "<div><pre><code>a = 1\n\nb = 2</code></pre></div>")
+
     def test_heading(self):
         self.assertEqual(block_to_block_type("# Heading 1"), "heading")
         self.assertEqual(block_to_block_type("## Subheading"), "heading")
@@ -441,6 +472,17 @@ End of document.
     def test_invalid_ordered_list(self):
         self.assertEqual(block_to_block_type("1. First item\n3. Incorrect numbering"), "paragraph")
 
+    def test_block_type_requires_every_line(self):
+        self.assertEqual(block_to_block_type("> quoted\nnot quoted"), "paragraph")
+        self.assertEqual(block_to_block_type("* item\n*not an item"), "paragraph")
+        self.assertEqual(block_to_block_type("- item\n-\n- item"), "paragraph")
+        self.assertEqual(block_to_block_type("1. one\n2. two\nthree"), "paragraph")
+        self.assertEqual(block_to_block_type("2. two\n3. three"), "paragraph")
+        self.assertEqual(block_to_block_type("- item\n1. item"), "paragraph")
+        self.assertEqual(block_to_block_type("- item\n  nested text"), "paragraph")
+        self.assertEqual(block_to_block_type("#Not a heading"), "paragraph")
+        self.assertEqual(block_to_block_type("```\nunterminated"), "paragraph")
+
     def test_heading(self):
         md = "# Heading"
         result = markdown_to_html_node(md)
@@ -451,6 +493,15 @@ End of document.
         result = markdown_to_html_node(md)
         self.assertEqual(result.to_html(), "<div><p>This is a paragraph.</p></div>")
 
+    def test_markup_in_markdown_is_escaped(self):
+        md = 'Use <script> & [a "link"](/q?a=1&b=2) ![say "hi"](/hi.png)\n\n```\n<div>&nbsp;</div>\n```'
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>Use &lt;script> &amp; <a href="/q?a=1&amp;b=2">a "link"</a> '
+            '<img src="/hi.png" alt="say &quot;hi&quot;" loading="lazy"></img></p>'
+            "<pre><code>&lt;div>&amp;nbsp;&lt;/div></code></pre></div>",
+        )
+
     def test_code_block1(self):
         md = "```\nprint('Hello')\n```"
         result = markdown_to_html_node(md)
@@ -472,6 +523,59 @@ End of document.
         result = markdown_to_html_node(md)
         self.assertEqual(result.to_html(), "<div><ol><li>First item</li><li>Second item</li></ol></div>")
 
+    def test_code_block_language(self):
+        md = "```haskell title=x\nmain = print 1\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code class=\"language-haskell\">main = print 1</code></pre></div>",
+        )
+
+    def test_code_block_is_highlighted(self):
+        md = "```python\nprint('<b>')  # done\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code class="language-python"><span class="nb">print</span>('
+            "<span class=\"s\">'&lt;b>'</span>)  <span class=\"c\"># done</span></code></pre></div>",
+        )
+
+    def test_nested_list(self):
+        md = "- a\n  - b\n    1. c\n    2. d\n  - e\n- f"
+        self.assertEqual(block_to_block_type(md), "unordered_list")
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>a<ul><li>b<ol><li>c</li><li>d</li></ol></li><li>e</li></ul></li><li>f</li></ul></div>",
+        )
+
+    def test_nested_ordered_list_keeps_its_start(self):
+        md = "1. a\n   3. b\n2. c"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><ol><li>a<ol start="3"><li>b</li></ol></li><li>c</li></ol></div>',
+        )
+
+    def test_list_nesting_is_capped(self):
+        md = "\n".join("  " * i + f"- {i}" for i in range(MAX_LIST_DEPTH + 20))
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html.count("<ul>"), MAX_LIST_DEPTH)
+        self.assertIn(f"<li>{MAX_LIST_DEPTH + 19}</li>", html)
+
+    def test_table(self):
+        md = "| Name | Qty |\n|:-----|----:|\n| **a** | 1 |\n| b\\|c |\n| d | 2 | extra |"
+        self.assertEqual(block_to_block_type(md), "table")
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><table><thead><tr><th align="left">Name</th><th align="right">Qty</th></tr></thead><tbody>'
+            '<tr><td align="left"><b>a</b></td><td align="right">1</td></tr>'
+            '<tr><td align="left">b|c</td><td align="right"></td></tr>'
+            '<tr><td align="left">d</td><td align="right">2</td></tr></tbody></table></div>',
+        )
+
+    def test_table_needs_matching_delimiter_row(self):
+        self.assertEqual(block_to_block_type("a | b\n--|--\nc | d"), "table")
+        self.assertEqual(block_to_block_type("a | b\n--|--|--"), "paragraph")
+        self.assertEqual(block_to_block_type("a | b\nc | d"), "paragraph")
+        self.assertEqual(block_to_block_type("a\n---"), "paragraph")
+
     def test_valid_title(self):
         self.assertEqual(extract_title("# Welcome to My Blog"), "Welcome to My Blog")
 
@@ -482,8 +586,66 @@ End of document.
         with self.assertRaises(ValueError):
             extract_title("This is just a paragraph\nAnother line")
 
+    def test_parse_markdown_returns_the_first_h1(self):
+        node, title = parse_markdown("Intro\n\n## Sub\n\n# The **Title**\n\n# Second")
+        self.assertEqual(title, "The **Title**")
+        self.assertEqual(node.to_html(), markdown_to_html_node("Intro\n\n## Sub\n\n# The **Title**\n\n# Second").to_html())
+        self.assertIsNone(parse_markdown("No heading")[1])
+
     def test_title_among_other_text(self):
-        markdown = "Some text\n# My Title\nMore text"
+        markdown = "Some text\n\n# My Title\n\nMore text"
         self.assertEqual(extract_title(markdown), "My Title")
+
+    def test_title_matches_parse_markdown(self):
+        # Neither a "# " line inside a fence nor one inside a paragraph is a heading block.
+        for markdown in [
+            "```\n# comment\n```\n\n# Title",
+            "```\n\n# comment\n\n```\n\n# Title",
+            "Some text\n# not a heading\n\n# Title",
+        ]:
+            self.assertEqual(extract_title(markdown), "Title")
+            self.assertEqual(parse_markdown(markdown)[1], "Title")
+        with self.assertRaises(ValueError):
+            extract_title("```\n# comment\n```")
+
+class TestInlineScanner(unittest.TestCase):
+    SAMPLES = [
+        "",
+        "plain text",
+        "This is **bold** and *italic* with a `code block`, ![image](url), and [link](url).",
+        "**a *b* c**",
+        "*a_b*",
+        "***a***",
+        "a``b",
+        "x***y**",
+        "![a](b)[c](d)",
+        "![a](b [c](d)",
+        "`**not bold**` and **`not code`**",
+        "snake_case_word",
+    ]
+
+    def test_matches_multipass_pipeline(self):
+        for text in self.SAMPLES:
+            with self.subTest(text=text):
+                try:
+                    expected = text_to_textnodes_multipass(text)
+                except ValueError:
+                    with self.assertRaises(ValueError):
+                        text_to_textnodes(text)
+                    continue
+                self.assertEqual(text_to_textnodes(text), expected)
+
+    def test_unclosed_delimiters_raise(self):
+        for text in ["**bold", "`code", "*a**", "_a*b*c_", "**a `b` c**"]:
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    text_to_textnodes(text)
+
+    def test_delimiters_inside_link_text_are_literal(self):
+        self.assertEqual(
+            text_to_textnodes("[**x**](url)"),
+            [TextNode("**x**", TextType.LINK, "url")],
+        )
+
 if __name__ == "__main__":
     unittest.main()
@@ -32,7 +32,7 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_image_to_html(self):
         text_node = TextNode("Image description", TextType.IMAGE, "https://example.com/image.jpg")
         html_node = text_node_to_html_node(text_node)
-        self.assertEqual(html_node.to_html(), '<img src="https://example.com/image.jpg" alt="Image description"></img>')
+        self.assertEqual(html_node.to_html(), '<img src="https://example.com/image.jpg" alt="Image description" loading="lazy"></img>')
 
     def test_invalid_text_type(self):
         text_node = TextNode("Invalid text", None)
@@ -0,0 +1,93 @@
+import os
+import threading
+import unittest
+from initilizer import PageGenerationError, generate_pages_recursive
+from manifest import BuildManifest
+from pipeline import run_pipeline
+from sitetest import SiteTestCase
+from template import Template
+
+
+class TestParallelBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(12):
+            self.write(
+                os.path.join(self.content, f"section{i % 3}", f"page{i}.md"),
+                f"# Page {i}\n\nSome **bold** text and a [link](/page{i}).\n\n* one\n* two",
+            )
+
+    def snapshot(self, public):
+        files = {}
+        for dir_path, _, file_names in os.walk(public):
+            for name in file_names:
+                path = os.path.join(dir_path, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, public)] = f.read()
+        return files
+
+    def test_parallel_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.template, serial)
+        generate_pages_recursive(self.content, self.template, parallel, jobs=4)
+        serial_files = self.snapshot(serial)
+        self.assertEqual(len(serial_files), 12)
+        self.assertEqual(serial_files, self.snapshot(parallel))
+
+    def test_pipeline_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        generate_pages_recursive(self.content, self.template, serial)
+        for jobs in (1, 2):
+            pipelined = os.path.join(self.root, f"pipelined{jobs}")
+            manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+            generate_pages_recursive(self.content, self.template, pipelined, manifest, jobs=jobs, pipelined=True)
+            self.assertEqual(self.snapshot(serial), self.snapshot(pipelined))
+            self.assertEqual(len(manifest.entries), 12)
+
+    def test_highlight_stats_are_summed_across_workers(self):
+        for i in range(12):
+            with open(os.path.join(self.content, f"section{i % 3}", f"page{i}.md"), "a", encoding="utf-8") as f:
+                f.write("\n\n```python\nshared_snippet = [1, 2]\n```")
+        for jobs in (1, 4):
+            stats = generate_pages_recursive(self.content, self.template, os.path.join(self.root, f"out{jobs}"), jobs=jobs)
+            self.assertEqual(stats["highlight_hits"] + stats["highlight_misses"], 12)
+            self.assertLessEqual(stats["highlight_misses"], jobs)
+
+    def test_pipeline_queues_stay_bounded(self):
+        pages = [
+            (os.path.join(self.content, f"section{i % 3}", f"page{i}.md"), os.path.join(self.root, "out", f"{i}.html"), None)
+            for i in range(12)
+        ]
+        done = []
+        threads = set()
+
+        def on_done(*page_and_facts):
+            done.append(page_and_facts[:-1])
+            threads.add(threading.get_ident())
+
+        stats, report = run_pipeline(pages, Template.load(self.template), queue_size=2, on_done=on_done)
+        self.assertEqual(stats["pages"], 12)
+        self.assertEqual(report.pages, 12)
+        self.assertEqual(sorted(done), sorted(pages))
+        # Recording happens on the I/O threads, not on the event loop's thread.
+        self.assertNotIn(threading.get_ident(), threads)
+        for queue in (report.read_queue, report.write_queue):
+            self.assertLessEqual(queue.peak, 2)
+            self.assertGreater(queue.samples, 0)
+        self.assertIn("pages/s", report.format())
+
+    def test_error_names_failing_source(self):
+        broken = os.path.join(self.content, "section1", "broken.md")
+        self.write(broken, "No title here")
+        for jobs, pipelined in ((1, False), (4, False), (1, True), (2, True)):
+            with self.assertRaises(PageGenerationError) as ctx:
+                generate_pages_recursive(
+                    self.content, self.template, os.path.join(self.root, "out"), jobs=jobs, pipelined=pipelined
+                )
+            self.assertEqual(ctx.exception.source_path, broken)
+            self.assertIn(broken, str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
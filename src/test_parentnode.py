@@ -1,3 +1,4 @@
+import io
 import unittest
 from htmlnode import HTMLNode
 from leafnode import LeafNode
@@ -191,5 +192,36 @@ class TestParentNodeComplex(unittest.TestCase):
         )
 
 
+class TestParentNodeStreaming(unittest.TestCase):
+    def make_tree(self):
+        return ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")], {"class": "lead"}),
+                ParentNode("ul", [LeafNode("li", "One"), LeafNode("li", "Two")]),
+            ],
+        )
+
+    def test_iter_html_matches_to_html(self):
+        node = self.make_tree()
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_write_html_matches_to_html(self):
+        node = self.make_tree()
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+
+    def test_write_html_with_custom_child(self):
+        class CustomHTMLNode(HTMLNode):
+            def to_html(self):
+                return "<custom></custom>"
+
+        node = ParentNode("div", [CustomHTMLNode()])
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<div><custom></custom></div>")
+
+
 if __name__ == "__main__":
     unittest.main()
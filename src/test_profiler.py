@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from initilizer import generate_pages_recursive
+from profiler import NULL_PROFILER, BuildProfiler
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def make_profiler(self):
+        profiler = BuildProfiler()
+        profiler.merge(
+            [
+                ("read", "a.md", 0, 2_000_000, 1, 1),
+                ("parse", "a.md", 2_000_000, 5_000_000, 1, 1),
+                ("read", "b.md", 0, 1_000_000, 2, 1),
+                ("sync_static", None, 0, 3_000_000, 1, 1),
+            ]
+        )
+        return profiler
+
+    def test_stage_records_duration(self):
+        profiler = BuildProfiler()
+        with profiler.stage("parse", "page.md"):
+            pass
+        [(name, page, _, duration, pid, _)] = profiler.records
+        self.assertEqual((name, page, pid), ("parse", "page.md", os.getpid()))
+        self.assertGreaterEqual(duration, 0)
+
+    def test_stage_summary(self):
+        summary = self.make_profiler().stage_summary()
+        self.assertEqual(summary["read"], (2, 3_000_000))
+        self.assertEqual(summary["parse"], (1, 5_000_000))
+
+    def test_slowest_pages(self):
+        self.assertEqual(self.make_profiler().slowest_pages(1), [("a.md", 7_000_000)])
+
+    def test_format_report(self):
+        report = self.make_profiler().format_report(top=2)
+        self.assertIn("parse", report)
+        self.assertIn("slowest 2 page(s):", report)
+
+    def test_chrome_trace(self):
+        path = os.path.join(self.root, "trace.json")
+        self.make_profiler().write_chrome_trace(path)
+        with open(path, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 4)
+        self.assertEqual(events[1], {
+            "name": "parse", "cat": "build", "ph": "X", "ts": 2000.0, "dur": 5000.0,
+            "pid": 1, "tid": 1, "args": {"page": "a.md"},
+        })
+
+    def test_null_profiler(self):
+        with NULL_PROFILER.stage("read", "a.md"):
+            pass
+        self.assertFalse(NULL_PROFILER.enabled)
+
+    def test_build_records_every_page_in_parallel(self):
+        content = os.path.join(self.root, "content")
+        os.makedirs(content)
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("{{ Title }}{{ Content }}")
+        for i in range(3):
+            with open(os.path.join(content, f"page{i}.md"), "w", encoding="utf-8") as f:
+                f.write(f"# Page {i}")
+
+        for pipelined in (False, True):
+            profiler = BuildProfiler()
+            generate_pages_recursive(
+                content, template, os.path.join(self.root, "public"), jobs=2, profiler=profiler, pipelined=pipelined
+            )
+            summary = profiler.stage_summary()
+            for stage in ("read", "parse", "write"):
+                self.assertEqual(summary[stage][0], 3)
+            self.assertEqual(len(profiler.page_totals()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
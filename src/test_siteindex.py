@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+from siteindex import SiteIndex, page_metadata, page_url, search_terms, summarize, write_site_outputs
+from sitetest import SiteTestCase
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+class TestPageMetadata(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("public", "index.html"), "public"), "/")
+        self.assertEqual(page_url(os.path.join("public", "blog", "index.html"), "public"), "/blog/")
+        self.assertEqual(page_url(os.path.join("public", "blog", "post.html"), "public"), "/blog/post.html")
+
+    def test_summary_skips_headings_and_navigation(self):
+        markdown = "# Title\n\n[Back Home](/)\n\nThe **first** real [paragraph](/x).\n\nSecond one."
+        self.assertEqual(summarize(markdown), "The first real paragraph.")
+
+    def test_long_summary_is_cut_at_a_word(self):
+        summary = summarize("# Title\n\n" + "word " * 100)
+        self.assertLessEqual(len(summary), 201)
+        self.assertTrue(summary.endswith("word…"))
+
+    def test_front_matter_title_date_and_summary(self):
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, "page.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("---\ntitle: Declared\ndate: 2001-09-09T01:46:40Z\n---\n# Heading\n\nBody words.")
+            metadata = page_metadata(path, "/page.html")
+        finally:
+            shutil.rmtree(root)
+        self.assertEqual(metadata["title"], "Declared")
+        self.assertEqual(metadata["mtime"], 1_000_000_000)
+        self.assertEqual(metadata["summary"], "Body words.")
+        self.assertNotIn("declared", metadata["terms"])
+
+    def test_search_terms(self):
+        markdown = "# Elves & Men\n\nSee [the Shire](/shire) ![map](/images/map.png) in 2024, a b"
+        self.assertEqual(search_terms(markdown), ["2024", "elves", "in", "men", "see", "shire", "the"])
+
+
+class TestSiteOutputs(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index_path = os.path.join(self.cache, "pages.json")
+        self.write(os.path.join(self.content, "index.md"), "# Home & Hearth\n\nWelcome to the shire.")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nElves sail west.")
+        os.utime(os.path.join(self.content, "index.md"), (1_000_000_000, 1_000_000_000))
+
+    def build(self):
+        index = SiteIndex.load(self.index_path)
+        super().build(index=index)
+        index.save()
+        write_site_outputs(self.public, index, "https://example.com/")
+        return index
+
+    def test_sitemap_and_feed(self):
+        self.build()
+        sitemap = ET.parse(os.path.join(self.public, "sitemap.xml")).getroot()
+        self.assertEqual(
+            [loc.text for loc in sitemap.iter(f"{SITEMAP}loc")],
+            ["https://example.com/", "https://example.com/blog/post.html"],
+        )
+
+        feed = ET.parse(os.path.join(self.public, "atom.xml")).getroot()
+        self.assertEqual(feed.find(f"{ATOM}title").text, "Home & Hearth")
+        entries = feed.findall(f"{ATOM}entry")
+        # Newest first.
+        self.assertEqual([entry.find(f"{ATOM}title").text for entry in entries], ["Post", "Home & Hearth"])
+        self.assertEqual(entries[1].find(f"{ATOM}updated").text, "2001-09-09T01:46:40Z")
+        self.assertEqual(entries[1].find(f"{ATOM}summary").text, "Welcome to the shire.")
+
+    def test_search_index_is_sharded_by_prefix(self):
+        self.build()
+        search = os.path.join(self.public, "search")
+        with open(os.path.join(search, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        self.assertEqual(sorted(index), ["prefix_length", "shards"])
+        self.assertIn("sh", index["shards"])
+        with open(os.path.join(search, "sh.json"), encoding="utf-8") as f:
+            self.assertEqual(
+                json.load(f),
+                {
+                    "documents": [{"url": "/", "title": "Home & Hearth", "summary": "Welcome to the shire."}],
+                    "terms": {"shire": [0]},
+                },
+            )
+        # Shards number their own documents: the post is the first one "el" points to.
+        with open(os.path.join(search, "el.json"), encoding="utf-8") as f:
+            shard = json.load(f)
+        self.assertEqual([shard["documents"][i]["url"] for i in shard["terms"]["elves"]], ["/blog/post.html"])
+        self.assertEqual(sorted(os.listdir(search)), sorted(["index.json"] + [f"{p}.json" for p in index["shards"]]))
+
+    def test_unchanged_outputs_are_left_alone(self):
+        self.build()
+        outputs = [os.path.join(self.public, name) for name in ("sitemap.xml", "atom.xml")]
+        search = os.path.join(self.public, "search")
+        outputs += [os.path.join(search, name) for name in os.listdir(search)]
+        for path in outputs:
+            os.utime(path, ns=(0, 0))
+        self.build()
+        self.assertEqual([os.stat(path).st_mtime_ns for path in outputs], [0] * len(outputs))
+        self.assertEqual(sorted(os.listdir(search)), sorted(os.path.basename(path) for path in outputs[2:]))
+
+    def test_pages_are_indexed_from_the_render(self):
+        reads = []
+
+        def recording_open(path, *args, **kwargs):
+            reads.append(path)
+            return open(path, *args, **kwargs)
+
+        with mock.patch("initilizer.open", recording_open, create=True):
+            index = self.build()
+        sources = [os.path.join(self.content, "blog", "post.md"), os.path.join(self.content, "index.md")]
+        # Each source is read once, to render it, and not again to index it.
+        self.assertEqual(sorted(path for path in reads if path.endswith(".md")), sources)
+        for source in sources:
+            self.assertEqual(index.pages[source], page_metadata(source, index.pages[source]["url"]))
+
+    def test_incremental_build_keeps_unchanged_pages(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nDwarves dig deep.")
+        index = self.build()
+        self.assertEqual(len(index.pages), 2)
+        self.assertIn("dwarves", index.pages[os.path.join(self.content, "blog", "post.md")]["terms"])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "search", "el.json")))
+
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(list(self.build().pages), [os.path.join(self.content, "index.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
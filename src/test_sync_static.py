@@ -0,0 +1,84 @@
+import os
+import shutil
+import unittest
+from initilizer import sync_static
+from sitetest import SiteTestCase
+
+
+class TestSyncStatic(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png-bytes")
+
+    def test_first_sync_copies_everything(self):
+        report = sync_static(self.static, self.public)
+        self.assertEqual((report.copied, report.skipped, report.removed), (2, 0, 0))
+        self.assertEqual(sorted(report.files), [os.path.join("images", "logo.png"), "index.css"])
+        self.assertEqual(self.read(os.path.join(self.public, "images", "logo.png")), "png-bytes")
+
+    def test_second_sync_skips_unchanged_files(self):
+        sync_static(self.static, self.public)
+        report = sync_static(self.static, self.public)
+        self.assertEqual((report.copied, report.skipped, report.removed), (0, 2, 0))
+
+    def test_changed_file_is_copied(self):
+        sync_static(self.static, self.public)
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        report = sync_static(self.static, self.public)
+        self.assertEqual((report.copied, report.skipped), (1, 1))
+        self.assertEqual(report.changed, ["index.css"])
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body { margin: 0 }")
+
+    def test_same_size_different_mtime_falls_back_to_hash(self):
+        sync_static(self.static, self.public)
+        dest = os.path.join(self.public, "index.css")
+        os.utime(dest, ns=(0, 0))
+        report = sync_static(self.static, self.public)
+        self.assertEqual(report.skipped, 2)
+
+        self.write(dest, "body [}")
+        os.utime(dest, ns=(0, 0))
+        report = sync_static(self.static, self.public)
+        self.assertEqual(report.copied, 1)
+        self.assertEqual(self.read(dest), "body {}")
+
+    def test_owned_outputs_are_only_seeded(self):
+        owned = {os.path.join("images", "logo.png")}
+        dest = os.path.join(self.public, "images", "logo.png")
+        report = sync_static(self.static, self.public, owned=owned)
+        self.assertEqual(report.copied, 2)
+        self.write(dest, "optimized")
+        report = sync_static(self.static, self.public, owned=owned)
+        self.assertEqual((report.copied, report.skipped), (0, 2))
+        self.assertEqual(self.read(dest), "optimized")
+        self.assertIn(os.path.join("images", "logo.png"), report.files)
+
+    def test_stale_outputs_are_removed(self):
+        first = sync_static(self.static, self.public)
+        self.write(os.path.join(self.public, "index.html"), "<html></html>")
+        shutil.rmtree(os.path.join(self.static, "images"))
+        report = sync_static(self.static, self.public, first.files)
+        self.assertEqual(report.removed, 1)
+        self.assertEqual(report.changed, [os.path.join("images", "logo.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        # Files not produced by the static sync are left alone.
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_hardlink_mode(self):
+        sync_static(self.static, self.public, link="hardlink")
+        src_stat = os.stat(os.path.join(self.static, "index.css"))
+        dest_stat = os.stat(os.path.join(self.public, "index.css"))
+        self.assertEqual(src_stat.st_ino, dest_stat.st_ino)
+
+    def test_unknown_link_mode(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.static, self.public, link="symlink")
+
+    def test_missing_source(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_static(os.path.join(self.root, "missing"), self.public)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import io
+import unittest
+from leafnode import LeafNode
+from parentnode import ParentNode
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compiles_into_chunks_and_slots(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.chunks, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        html = template.render({"Title": "Hello", "Content": "<p>World</p>"})
+        self.assertEqual(html, "<title>Hello</title><body><p>World</p></body>")
+
+    def test_placeholder_whitespace_is_optional(self):
+        template = Template("{{Title}}|{{   Title }}")
+        self.assertEqual(template.render({"Title": "x"}), "x|x")
+
+    def test_custom_placeholders_from_metadata(self):
+        template = Template('<meta name="author" content="{{ Author }}">{{ Content }}')
+        html = template.render({"Author": "Tolkien", "Content": "<p>hi</p>"})
+        self.assertEqual(html, '<meta name="author" content="Tolkien"><p>hi</p>')
+
+    def test_values_are_not_rescanned(self):
+        template = Template("{{ Title }}{{ Content }}")
+        html = template.render({"Title": "{{ Content }}", "Content": "body"})
+        self.assertEqual(html, "{{ Content }}body")
+
+    def test_unknown_placeholder_raises(self):
+        template = Template("{{ Title }} by {{ Author }}", name="page.html")
+        with self.assertRaises(ValueError) as ctx:
+            template.render({"Title": "Hello"})
+        self.assertIn("Author", str(ctx.exception))
+        self.assertIn("page.html", str(ctx.exception))
+
+    def test_template_without_placeholders(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.placeholders, set())
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_write_streams_nodes(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        content = ParentNode("p", [LeafNode("b", "World")])
+        buffer = io.StringIO()
+        template.write(buffer, {"Title": "Hello", "Content": content})
+        self.assertEqual(buffer.getvalue(), "<title>Hello</title><body><p><b>World</b></p></body>")
+        self.assertEqual(template.render({"Title": "Hello", "Content": content}), buffer.getvalue())
+
+    def test_write_checks_placeholders_first(self):
+        template = Template("{{ Title }}{{ Content }}")
+        buffer = io.StringIO()
+        with self.assertRaises(ValueError):
+            template.write(buffer, {"Title": "x"})
+        self.assertEqual(buffer.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()